@@ -0,0 +1,100 @@
+"""Before/after timing of the email and reminder index migrations.
+
+Seeds a throwaway SQLite database (or the database in GREENAI_DATABASE_URI
+when --uri is given), reverts the schema to the unindexed baseline, times
+the lookups used by the login and reminder routes, applies the migrations
+and times them again.
+
+    python bench_email_indexes.py --users 100000 --lookups 2000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, time as dtime, timedelta
+
+
+def seed(db, UserDetails, Active, Reminder, users, reminders_per_user):
+    db.session.bulk_insert_mappings(UserDetails, [
+        {'name': f'Farmer {i}', 'email': f'farmer{i}@greenai.test', 'mobile': f'9{i:09d}',
+         'language': 'en', 'location': '13.08,80.27', 'crops': 'paddy', 'land_size': '2'}
+        for i in range(users)
+    ])
+    db.session.bulk_insert_mappings(Active, [
+        {'email': f'farmer{i}@greenai.test'} for i in range(0, users, 4)
+    ])
+    start = date(2026, 1, 1)
+    db.session.bulk_insert_mappings(Reminder, [
+        {'user_id': i, 'reminder_type': 'Irrigation', 'crop_type': 'paddy',
+         'date': start + timedelta(days=j * 7), 'time': dtime(6, 30), 'interval_type': 'weekly',
+         'is_active': j % 5 != 0}
+        for i in range(users) for j in range(reminders_per_user)
+    ])
+    db.session.commit()
+
+
+def time_lookups(db, UserDetails, Active, Reminder, users, lookups):
+    rng = random.Random(42)
+    ids = [rng.randrange(users) for _ in range(lookups)]
+    results = {}
+
+    started = time.perf_counter()
+    for i in ids:
+        UserDetails.query.filter_by(email=f'farmer{i}@greenai.test').first()
+    results['userdetails by email'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for i in ids:
+        Active.query.filter_by(email=f'farmer{i}@greenai.test').first()
+    results['active by email'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for i in ids:
+        Reminder.query.filter_by(user_id=i, is_active=True) \
+            .order_by(Reminder.date.asc(), Reminder.time.asc()).all()
+    results['get_reminders query'] = time.perf_counter() - started
+
+    db.session.rollback()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--reminders-per-user', type=int, default=3)
+    parser.add_argument('--lookups', type=int, default=2000)
+    parser.add_argument('--uri', action='store_true',
+                        help='use GREENAI_DATABASE_URI instead of a temporary SQLite file')
+    args = parser.parse_args()
+
+    if not args.uri:
+        path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+        os.environ['GREENAI_DATABASE_URI'] = f'sqlite:///{path}'
+
+    import migrations
+    from greenai_app import create_app, db, UserDetails, Active, Reminder
+
+    app = create_app()
+
+    with app.app_context():
+        db.create_all()
+        print(f"Seeding {args.users} users ...")
+        seed(db, UserDetails, Active, Reminder, args.users, args.reminders_per_user)
+
+        migrations.stamp(db.engine)
+        migrations.downgrade(db.engine, 0)
+        before = time_lookups(db, UserDetails, Active, Reminder, args.users, args.lookups)
+        migrations.upgrade(db.engine)
+        after = time_lookups(db, UserDetails, Active, Reminder, args.users, args.lookups)
+
+    print(f"\n{args.lookups} lookups each")
+    print(f"{'query':<24}{'before (ms/op)':>16}{'after (ms/op)':>16}{'speedup':>10}")
+    for name in before:
+        b = before[name] / args.lookups * 1000
+        a = after[name] / args.lookups * 1000
+        print(f"{name:<24}{b:>16.3f}{a:>16.3f}{b / a:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Bytes on the wire and server CPU per request for each response encoding.
+
+Requests /get_messages and /api/reminders through the WSGI test client
+against a seeded SQLite database with every Accept / Accept-Encoding
+combination, with the compression cache cold (cleared before each
+request) and warm.
+
+    python bench_encoding.py --requests 200
+"""
+import argparse
+import os
+import tempfile
+import time
+
+VARIANTS = (
+    ('json', {}),
+    ('json + gzip', {'Accept-Encoding': 'gzip'}),
+    ('json + br', {'Accept-Encoding': 'br'}),
+    ('msgpack', {'Accept': 'application/msgpack'}),
+    ('msgpack + gzip', {'Accept': 'application/msgpack', 'Accept-Encoding': 'gzip'}),
+    ('msgpack + br', {'Accept': 'application/msgpack', 'Accept-Encoding': 'br'}),
+)
+
+
+def measure(client, path, headers, requests, before_each=None):
+    size = 0
+    started = time.process_time()
+    for _ in range(requests):
+        if before_each:
+            before_each()
+        response = client.get(path, headers=headers)
+        size = len(response.data)
+    return size, (time.process_time() - started) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+
+    if not os.environ.get('GREENAI_DATABASE_URI'):
+        path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+        os.environ['GREENAI_DATABASE_URI'] = f'sqlite:///{path}'
+    os.environ['GREENAI_METRICS_SAMPLE_RATE'] = '0'
+
+    import greenai_app
+    from seed_data import seed_all
+
+    app = greenai_app.create_app()
+    with app.app_context():
+        greenai_app.db.create_all()
+        seed_all(users=20, messages=5000, reminders=4000, seed=1)
+
+    client = app.test_client()
+    cache = greenai_app.compression_cache
+    for path in ('/get_messages?limit=200', '/api/reminders?user_id=1'):
+        print(path)
+        print(f"  {'encoding':<16}{'bytes':>9}{'cold CPU ms':>13}{'warm CPU ms':>13}")
+        for name, headers in VARIANTS:
+            size, cold = measure(client, path, headers, args.requests, cache.clear)
+            _, warm = measure(client, path, headers, args.requests)
+            print(f"  {name:<16}{size:>9}{cold * 1000:>13.3f}{warm * 1000:>13.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Messages/sec of /send_message with and without group commit.
+
+Many client threads post concurrently through the WSGI test client
+against a file-backed database (SQLite by default, so every commit is a
+real fsync; set GREENAI_DATABASE_URI for MySQL).
+
+    python bench_group_commit.py --messages 2000 --threads 16
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+
+def post_messages(app, count, threads):
+    counter = iter(range(count))
+    lock = threading.Lock()
+    errors = []
+
+    def worker():
+        client = app.test_client()
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            response = client.post('/send_message', json={'name': 'bench', 'message': f'pest alert {i}'})
+            if response.status_code != 201:
+                errors.append(response.status_code)
+
+    started = time.perf_counter()
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return time.perf_counter() - started, len(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=16)
+    args = parser.parse_args()
+
+    if not os.environ.get('GREENAI_DATABASE_URI'):
+        path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+        os.environ['GREENAI_DATABASE_URI'] = f'sqlite:///{path}'
+    os.environ['GREENAI_METRICS_SAMPLE_RATE'] = '0'
+
+    import greenai_app
+    from group_commit import GroupCommitWriter
+
+    app = greenai_app.create_app()
+    with app.app_context():
+        greenai_app.db.create_all()
+
+    results = []
+    grouped = GroupCommitWriter(greenai_app.with_app_context(app, greenai_app.insert_chat_messages))
+    for label, writer in (('per-request commit', None), ('group commit', grouped)):
+        greenai_app.chat_writer = writer
+        elapsed, errors = post_messages(app, args.messages, args.threads)
+        extra = f"  ({writer.batches} batches, {writer.rows / max(writer.batches, 1):.1f} rows each)" if writer else ''
+        results.append((label, elapsed, errors, extra))
+
+    print(f"{args.messages} messages from {args.threads} threads")
+    for label, elapsed, errors, extra in results:
+        print(f"{label:<20}{args.messages / elapsed:>10.0f} msg/s  errors={errors}{extra}")
+
+
+if __name__ == '__main__':
+    main()
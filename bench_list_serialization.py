@@ -0,0 +1,103 @@
+"""Rows per second of the list endpoints' query + serialization paths.
+
+Compares the old path (full ORM objects, to_dict(), jsonify) with the
+column projection + fast_json path now used by get_messages and
+get_reminders, on a seeded SQLite database. Also checks that both paths
+decode to the same data.
+
+    python bench_list_serialization.py --rows 10000 100000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import date, datetime, time as dtime, timedelta
+
+
+def seed(db, ChatMessage, Reminder, rows):
+    start = datetime(2026, 1, 1, 6, 0)
+    db.session.bulk_insert_mappings(ChatMessage, [
+        {'name': f'Farmer {i % 500}', 'message': f'Leaf blight spotted on paddy field {i}',
+         'timestamp': start + timedelta(seconds=i * 7, microseconds=i % 1000)}
+        for i in range(rows)
+    ])
+    db.session.bulk_insert_mappings(Reminder, [
+        {'user_id': 1, 'reminder_type': 'Irrigation', 'crop_type': 'paddy',
+         'date': date(2026, 1, 1) + timedelta(days=i % 365), 'time': dtime(i % 24, i % 60),
+         'interval_type': 'weekly', 'is_active': True,
+         'created_at': start, 'updated_at': start + timedelta(minutes=i)}
+        for i in range(rows)
+    ])
+    db.session.commit()
+
+
+def timed(fn, repeat=3):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000])
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    os.environ['GREENAI_DATABASE_URI'] = f'sqlite:///{path}'
+
+    from flask import jsonify
+    from sqlalchemy import select
+    import fast_json
+    from greenai_app import (create_app, db, ChatMessage, Reminder, MESSAGE_COLUMNS, REMINDER_COLUMNS,
+                             message_records, reminder_records)
+
+    app = create_app()
+
+    print(f"JSON encoder: {'orjson' if fast_json.orjson else 'stdlib'}")
+    print(f"{'endpoint':<16}{'rows':>8}{'old rows/s':>14}{'new rows/s':>14}{'speedup':>10}")
+
+    with app.app_context():
+        db.create_all()
+        seeded = 0
+        for rows in sorted(args.rows):
+            seed(db, ChatMessage, Reminder, rows - seeded)
+            seeded = rows
+
+            def old_messages():
+                messages = ChatMessage.query.order_by(ChatMessage.timestamp.asc()).all()
+                body = jsonify({'status': 'success', 'messages': [m.to_dict() for m in messages]}).get_data()
+                db.session.expunge_all()
+                return body
+
+            def new_messages():
+                records = message_records(select(*MESSAGE_COLUMNS).order_by(ChatMessage.timestamp.asc()))
+                return fast_json.dumps({'status': 'success', 'messages': records})
+
+            def old_reminders():
+                reminders = Reminder.query.filter_by(user_id=1, is_active=True) \
+                    .order_by(Reminder.date.asc(), Reminder.time.asc()).all()
+                body = jsonify({'success': True, 'reminders': [r.to_dict() for r in reminders]}).get_data()
+                db.session.expunge_all()
+                return body
+
+            def new_reminders():
+                records = reminder_records(select(*REMINDER_COLUMNS).filter_by(user_id=1, is_active=True)
+                                           .order_by(Reminder.date.asc(), Reminder.time.asc()))
+                return fast_json.dumps({'success': True, 'reminders': records})
+
+            for name, old, new in (('get_messages', old_messages, new_messages),
+                                   ('get_reminders', old_reminders, new_reminders)):
+                old_time, old_body = timed(old)
+                new_time, new_body = timed(new)
+                assert json.loads(old_body) == json.loads(new_body), f"{name} output differs"
+                print(f"{name:<16}{rows:>8}{rows / old_time:>14,.0f}{rows / new_time:>14,.0f}"
+                      f"{old_time / new_time:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
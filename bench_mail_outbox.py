@@ -0,0 +1,81 @@
+"""Throughput of the OTP mail outbox against a local SMTP stand-in.
+
+Compares the old inline path (new connection per email) with MailOutbox
+reusing connections across worker threads. Needs aiosmtpd:
+
+    pip install aiosmtpd
+    python bench_mail_outbox.py --emails 500 --workers 4
+"""
+import argparse
+import asyncio
+import smtplib
+import time
+
+from aiosmtpd.controller import Controller
+
+from mail_outbox import MailOutbox
+
+
+class CountingHandler:
+    def __init__(self, delay):
+        self.delay = delay
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.received += 1
+        return '250 OK'
+
+
+def inline_send(host, port, count, body):
+    """One connection per email, as send_email() does."""
+    started = time.perf_counter()
+    for i in range(count):
+        server = smtplib.SMTP(host, port)
+        server.sendmail('bench@greenai.local', f'user{i}@greenai.local', body)
+        server.quit()
+    return time.perf_counter() - started
+
+
+def outbox_send(host, port, count, body, workers):
+    outbox = MailOutbox(host, port, 'bench@greenai.local', workers=workers,
+                        use_tls=False, max_queue=count)
+    started = time.perf_counter()
+    for i in range(count):
+        outbox.submit(f'user{i}@greenai.local', body)
+    enqueued = time.perf_counter() - started
+    outbox.join()
+    elapsed = time.perf_counter() - started
+    outbox.stop()
+    return enqueued, elapsed, outbox.sent, outbox.failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--emails', type=int, default=500)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--delay', type=float, default=0.0,
+                        help='seconds the stand-in server waits per message')
+    args = parser.parse_args()
+
+    handler = CountingHandler(args.delay)
+    controller = Controller(handler, hostname='127.0.0.1', port=8025)
+    controller.start()
+    body = "Subject: Your One-Time OTP Code for Verification\n\nYour OTP code: 123456\n"
+    try:
+        inline = inline_send(controller.hostname, controller.port, args.emails, body)
+        enqueued, pooled, sent, failed = outbox_send(
+            controller.hostname, controller.port, args.emails, body, args.workers)
+    finally:
+        controller.stop()
+
+    print(f"emails:              {args.emails}")
+    print(f"inline:              {inline:.3f}s  ({args.emails / inline:.0f} emails/s)")
+    print(f"outbox ({args.workers} workers):  {pooled:.3f}s  ({args.emails / pooled:.0f} emails/s)"
+          f"  sent={sent} failed={failed}")
+    print(f"send_otp enqueue:    {enqueued / args.emails * 1e6:.1f}us per request")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""Latency of /users/nearby lookups: grid index vs. a naive scan.
+
+Fills a file-backed database (SQLite by default; set GREENAI_DATABASE_URI
+for MySQL) with users spread over India, then answers the same radius
+queries by scanning and parsing every userdetails.location (the only
+option before user_locations) and through users_within().
+
+    python bench_nearby.py --users 100000 1000000 --queries 200
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+
+def fill(greenai_app, count, rng):
+    db = greenai_app.db
+    table = greenai_app.UserDetails.__table__
+    db.session.execute(table.delete())
+    db.session.commit()
+    batch = []
+    for i in range(count):
+        batch.append({
+            'name': f'Farmer {i}', 'email': f'farmer{i}@bench.test', 'mobile': '9000000000',
+            'language': 'en', 'crops': 'paddy', 'land_size': '1',
+            'location': f'{rng.uniform(8.0, 30.0):.5f},{rng.uniform(68.0, 97.0):.5f}'
+        })
+        if len(batch) == 10000:
+            db.session.execute(table.insert(), batch)
+            batch = []
+    if batch:
+        db.session.execute(table.insert(), batch)
+    db.session.commit()
+    started = time.perf_counter()
+    greenai_app.rebuild_user_locations()
+    return time.perf_counter() - started
+
+
+def naive_within(greenai_app, lat, lon, radius_km):
+    from sqlalchemy import select
+    from crop_stats import parse_location
+    from geo_index import haversine_km
+    table = greenai_app.UserDetails.__table__
+    matches = []
+    for user_id, location in greenai_app.db.session.execute(select(table.c.id, table.c.location)):
+        point = parse_location(location)
+        if point is not None:
+            distance = haversine_km(lat, lon, *point)
+            if distance <= radius_km:
+                matches.append((distance, user_id))
+    matches.sort()
+    return matches
+
+
+def timed(fn, queries):
+    latencies, results = [], []
+    for args in queries:
+        started = time.perf_counter()
+        results.append(fn(*args))
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    return latencies, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--naive-queries', type=int, default=5, help='the scan is slow; time fewer')
+    parser.add_argument('--radius', type=float, nargs='+', default=[10, 50])
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    if not os.environ.get('GREENAI_DATABASE_URI'):
+        path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+        os.environ['GREENAI_DATABASE_URI'] = f'sqlite:///{path}'
+
+    import greenai_app
+
+    rng = random.Random(args.seed)
+    with greenai_app.create_app().app_context():
+        greenai_app.db.create_all()
+        for count in args.users:
+            build = fill(greenai_app, count, rng)
+            print(f"{count} users (user_locations rebuilt in {build:.1f}s)")
+            for radius in args.radius:
+                queries = [(rng.uniform(10.0, 28.0), rng.uniform(70.0, 95.0), radius)
+                           for _ in range(args.queries)]
+                indexed, results = timed(lambda *q: greenai_app.users_within(*q), queries)
+                naive, naive_results = timed(lambda *q: naive_within(greenai_app, *q),
+                                             queries[:args.naive_queries])
+                assert [[u for _, u in r] for r in naive_results] == \
+                       [[u for _, u in r] for r in results[:args.naive_queries]]
+                matches = statistics.mean(len(r) for r in results)
+                print(f"  radius {radius:>4.0f} km  ~{matches:.0f} matches   "
+                      f"grid p50 {indexed[len(indexed) // 2] * 1000:7.2f} ms  "
+                      f"p95 {indexed[int(len(indexed) * 0.95)] * 1000:7.2f} ms   "
+                      f"naive scan p50 {naive[len(naive) // 2] * 1000:9.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""Build time and query latency of the message search index.
+
+Indexes a synthetic corpus with a Zipf-like vocabulary (a few very
+common farming words, a long tail of rare ones) straight into
+InvertedIndex, then times ranked queries of one to three terms.
+
+    python bench_search.py --messages 1000000 --queries 500
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from itertools import accumulate
+
+from search_index import InvertedIndex
+
+COMMON = ('paddy leaf blight rice wheat tomato pest spray water soil fertilizer yield '
+          'price market rain seed crop field disease urea harvest').split()
+
+
+def vocabulary(size, rng):
+    words = list(COMMON)
+    while len(words) < size:
+        words.append(''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(4, 9))))
+    return words
+
+
+def corpus(count, words, rng):
+    cum_weights = list(accumulate(1 / (rank + 1) for rank in range(len(words))))
+    for message_id in range(1, count + 1):
+        yield message_id, ' '.join(rng.choices(words, cum_weights=cum_weights, k=rng.randint(5, 25)))
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=1000000)
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--vocabulary', type=int, default=50000)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    words = vocabulary(args.vocabulary, rng)
+    index = InvertedIndex()
+
+    started = time.perf_counter()
+    for message_id, text in corpus(args.messages, words, rng):
+        index.add(message_id, text)
+    build = time.perf_counter() - started
+
+    path = os.path.join(tempfile.mkdtemp(), 'search.snapshot')
+    started = time.perf_counter()
+    index.save(path)
+    save = time.perf_counter() - started
+    started = time.perf_counter()
+    InvertedIndex().load(path)
+    load = time.perf_counter() - started
+
+    print(f"{args.messages} messages: build {build:.1f}s, snapshot save {save:.2f}s, "
+          f"load {load:.2f}s ({os.path.getsize(path) / 1e6:.0f} MB)")
+
+    pools = (('common terms', COMMON), ('mixed terms', words[:2000]), ('rare terms', words[2000:]))
+    for label, pool in pools:
+        latencies = []
+        for _ in range(args.queries):
+            query = ' '.join(rng.sample(pool, rng.randint(1, 3)))
+            started = time.perf_counter()
+            index.search(query, limit=20, offset=rng.choice((0, 0, 20, 100)))
+            latencies.append(time.perf_counter() - started)
+        print(f"{label:<14}p50 {percentile(latencies, 0.5) * 1000:6.2f} ms   "
+              f"p95 {percentile(latencies, 0.95) * 1000:6.2f} ms   "
+              f"max {max(latencies) * 1000:6.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""Worker startup cost: import time, create_app() and first-request latency.
+
+Each run starts a fresh interpreter against a seeded SQLite database and
+measures it two ways:
+
+    cold       the worker imports greenai_app and builds the app itself
+               (gunicorn without preload_app, or an autoscaled process)
+    preloaded  a master imports, builds and warm_up()s the app, then forks
+               the worker (gunicorn preload_app); only the fork and the
+               worker's requests count
+
+"ready ms" is the sum: how long until a new worker has answered its
+first request. "private MB" is the worker's unshared memory after its requests (Linux
+only): what each additional worker really costs.
+
+    python bench_startup.py --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PATH = '/get_messages'
+
+
+def private_mb():
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            fields = dict(line.split(':', 1) for line in f if ':' in line and not line.startswith('/'))
+    except OSError:
+        return None
+    kb = sum(int(fields[key].split()[0]) for key in ('Private_Clean', 'Private_Dirty') if key in fields)
+    return kb / 1024
+
+
+def serve_first_requests(app, timings):
+    client = app.test_client()
+    for name in ('first', 'second'):
+        started = time.perf_counter()
+        response = client.get(PATH)
+        timings[name] = time.perf_counter() - started
+        assert response.status_code == 200, response.status_code
+    timings['private_mb'] = private_mb()
+    return timings
+
+
+def child(mode):
+    started = time.perf_counter()
+    import greenai_app
+    imported = time.perf_counter()
+    app = greenai_app.create_app()
+    created = time.perf_counter()
+    timings = {'import': imported - started, 'create_app': created - imported, 'fork': 0.0}
+    if mode == 'cold':
+        return serve_first_requests(app, timings)
+
+    import gc
+    greenai_app.warm_up(app)
+    gc.freeze()
+    read_end, write_end = os.pipe()
+    forked = time.perf_counter()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_end)
+        worker = serve_first_requests(app, {'fork': time.perf_counter() - forked})
+        os.write(write_end, json.dumps(worker).encode())
+        os._exit(0)
+    os.close(write_end)
+    with os.fdopen(read_end) as f:
+        worker = json.loads(f.read())
+    os.waitpid(pid, 0)
+    # Import and create_app happened once in the master, not per worker
+    return {'import': 0.0, 'create_app': 0.0, **worker}
+
+
+def ms(values):
+    return f"{statistics.median(values) * 1000:>12.1f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--child', choices=('cold', 'preloaded'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(child(args.child)))
+        return
+
+    if not os.environ.get('GREENAI_DATABASE_URI'):
+        path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+        os.environ['GREENAI_DATABASE_URI'] = f'sqlite:///{path}'
+    os.environ.setdefault('GREENAI_MAIL_BACKEND', 'stub')
+
+    import greenai_app
+    from seed_data import seed_all
+
+    with greenai_app.create_app().app_context():
+        greenai_app.db.create_all()
+        seed_all(users=200, messages=2000, reminders=500, seed=1)
+
+    print(f"{args.runs} runs, first request GET {PATH}")
+    print(f"{'mode':<12}{'import ms':>12}{'create ms':>12}{'fork ms':>12}{'first ms':>12}{'ready ms':>12}"
+          f"{'second ms':>12}{'private MB':>12}")
+    for mode in ('cold', 'preloaded'):
+        runs = []
+        for _ in range(args.runs):
+            output = subprocess.run([sys.executable, __file__, '--child', mode], check=True,
+                                    capture_output=True, text=True).stdout
+            runs.append(json.loads(output.splitlines()[-1]))
+        for run in runs:
+            run['ready'] = run['import'] + run['create_app'] + run['fork'] + run['first']
+        memory = [run['private_mb'] for run in runs if run['private_mb'] is not None]
+        print(f"{mode:<12}" + ''.join(ms([run[key] for run in runs])
+                                      for key in ('import', 'create_app', 'fork', 'first', 'ready', 'second'))
+              + (f"{statistics.median(memory):>12.1f}" if memory else f"{'n/a':>12}"))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+"""Streaming NDJSON/CSV export and resumable batched import of whole tables.
+
+Exports read through a server-side cursor (`yield_per`), so memory stays
+flat however large the table is. Imports insert in executemany batches,
+each committed on its own, and record how many input rows are done in a
+`<file>.<table>.progress` checkpoint next to the input so an interrupted
+load can continue with resume=True.
+
+In CSV an empty field is read back as NULL for nullable columns.
+"""
+from datetime import date, datetime, time
+import csv
+import io
+import json
+import os
+
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer, String, Time
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+
+import fast_json
+
+
+FORMATS = ('ndjson', 'csv')
+
+
+def guess_format(path):
+    return 'csv' if path.lower().endswith('.csv') else 'ndjson'
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return value
+
+
+def export_chunks(session, table, fmt='ndjson', yield_per=2000):
+    """Yield the table as encoded NDJSON or CSV, one chunk per fetched batch."""
+    columns = [column.name for column in table.columns]
+    result = session.execute(select(table).order_by(*table.primary_key.columns),
+                             execution_options={'yield_per': yield_per})
+    if fmt == 'csv':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for partition in result.partitions():
+            writer.writerows([_csv_value(value) for value in row] for row in partition)
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+    else:
+        for partition in result.partitions():
+            yield b''.join(fast_json.dumps(dict(zip(columns, row))) for row in partition)
+
+
+def read_records(path, fmt):
+    """Yield one dict per input row."""
+    with open(path, newline='' if fmt == 'csv' else None, encoding='utf-8') as f:
+        if fmt == 'csv':
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _coerce(column, value):
+    if value is None:
+        return None
+    if value == '' and (column.nullable or not isinstance(column.type, String)):
+        return None
+    if isinstance(column.type, Boolean):
+        return value if isinstance(value, bool) else str(value).lower() in ('1', 'true', 't', 'yes')
+    if isinstance(column.type, Integer):
+        return int(value)
+    if isinstance(column.type, Float):
+        return float(value)
+    if isinstance(column.type, DateTime):
+        return value if isinstance(value, datetime) else datetime.fromisoformat(value)
+    if isinstance(column.type, Date):
+        return value if isinstance(value, date) else date.fromisoformat(value)
+    if isinstance(column.type, Time):
+        return value if isinstance(value, time) else time.fromisoformat(value)
+    return value
+
+
+def to_row(table, record):
+    """Table row from an exported record; unknown keys are ignored."""
+    return {column.name: _coerce(column, record[column.name])
+            for column in table.columns if column.name in record}
+
+
+class ImportProgress:
+    def __init__(self):
+        self.done = 0
+        self.inserted = 0
+        self.skipped = 0
+
+
+def _insert_batch(session, table, rows, progress):
+    try:
+        session.execute(insert(table), rows)
+        session.commit()
+        progress.inserted += len(rows)
+        return
+    except IntegrityError:
+        session.rollback()
+    # One row at a time so only the conflicting rows (usually ids already
+    # loaded before an interruption) are skipped
+    for row in rows:
+        try:
+            session.execute(insert(table), [row])
+            session.commit()
+            progress.inserted += 1
+        except IntegrityError:
+            session.rollback()
+            progress.skipped += 1
+
+
+def import_file(session, table, path, fmt=None, batch_size=5000, resume=False, on_batch=None):
+    """Load path into table. Returns an ImportProgress.
+
+    With resume=True the rows recorded in the checkpoint are skipped. The
+    checkpoint is removed once the whole file has been loaded.
+    on_batch(progress) is called after every committed batch.
+    """
+    fmt = fmt or guess_format(path)
+    checkpoint = f"{path}.{table.name}.progress"
+    progress = ImportProgress()
+    start = 0
+    if resume and os.path.exists(checkpoint):
+        with open(checkpoint) as f:
+            start = int(f.read().strip() or 0)
+
+    def flush(batch, done):
+        _insert_batch(session, table, batch, progress)
+        progress.done = done
+        with open(checkpoint, 'w') as f:
+            f.write(str(done))
+        if on_batch:
+            on_batch(progress)
+
+    batch = []
+    done = start
+    for i, record in enumerate(read_records(path, fmt)):
+        if i < start:
+            continue
+        batch.append(to_row(table, record))
+        done = i + 1
+        if len(batch) >= batch_size:
+            flush(batch, done)
+            batch = []
+    if batch:
+        flush(batch, done)
+    progress.done = done
+    if os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    return progress
@@ -0,0 +1,117 @@
+from collections import deque
+from threading import Condition
+import bisect
+import time
+
+
+class MessageBroker:
+    """In-process fan-out for new community chat messages.
+
+    send_message publishes each committed message once; every waiting
+    subscriber is woken by the same notify and reads it from a bounded
+    buffer of recent messages, so no subscriber has to query the database.
+    An idle subscriber holds nothing but its last seen id.
+
+    The broker is authoritative only for ids above its floor: the newest id
+    that was already in the database when it was primed, or the newest id
+    evicted from the buffer. Subscribers behind the floor catch up from the
+    database. Messages written by other worker processes are pulled in by
+    a periodic resync (see claim_resync).
+
+    Subscribers are only handed ids up to the confirmed mark: the newest id
+    up to which the database has been read. A message this process just
+    published may have a lower id committed by another worker in front of
+    it; handing it out before that gap is read would move subscribers past
+    the other message for good.
+    """
+
+    def __init__(self, history=500):
+        self._cond = Condition()
+        self._history = history
+        self._ids = deque()
+        self._messages = deque()
+        self._floor = None
+        self._confirmed = 0
+        self._last_resync = 0.0
+
+    @property
+    def primed(self):
+        return self._floor is not None
+
+    @property
+    def latest_id(self):
+        """Newest id subscribers can be handed (the confirmed mark)."""
+        with self._cond:
+            return self._latest_id()
+
+    def prime(self, latest_id):
+        """Record the newest id already stored before this broker saw anything."""
+        with self._cond:
+            if self._floor is None:
+                self._floor = latest_id
+                self._confirmed = max(self._confirmed, latest_id)
+                self._last_resync = time.monotonic()
+
+    def publish(self, message):
+        """Add a serialized message (dict with an 'id') and wake subscribers."""
+        with self._cond:
+            message_id = message['id']
+            if self._floor is not None and message_id <= self._floor:
+                return
+            # Concurrent commits can publish ids slightly out of order
+            pos = bisect.bisect_left(self._ids, message_id)
+            if pos < len(self._ids) and self._ids[pos] == message_id:
+                return
+            self._ids.insert(pos, message_id)
+            self._messages.insert(pos, message)
+            while len(self._ids) > self._history:
+                evicted = self._ids.popleft()
+                self._messages.popleft()
+                self._floor = max(self._floor or 0, evicted)
+            self._cond.notify_all()
+
+    def confirm(self, read_up_to):
+        """Record that every message with id <= read_up_to has been read from
+        the database (and published), and wake subscribers waiting for them."""
+        with self._cond:
+            if read_up_to > self._confirmed:
+                self._confirmed = read_up_to
+                self._cond.notify_all()
+
+    def since(self, after_id):
+        """Return (messages newer than after_id, complete).
+
+        complete is False when the buffer cannot vouch for everything after
+        after_id and the caller should read from the database instead.
+        """
+        with self._cond:
+            return self._since(after_id)
+
+    def wait(self, after_id, timeout):
+        """Block until a message newer than after_id arrives or timeout passes."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._latest_id() > after_id, timeout)
+            return self._since(after_id)
+
+    def claim_resync(self, interval):
+        """Return True for at most one caller per interval seconds.
+
+        The winner checks the database for messages from other processes and
+        publishes them, so idle subscribers share a single query.
+        """
+        with self._cond:
+            now = time.monotonic()
+            if now - self._last_resync < interval:
+                return False
+            self._last_resync = now
+            return True
+
+    def _latest_id(self):
+        return max(self._confirmed, self._floor or 0)
+
+    def _since(self, after_id):
+        if self._floor is None or after_id < self._floor:
+            return [], False
+        pos = bisect.bisect_right(self._ids, after_id)
+        end = bisect.bisect_right(self._ids, self._confirmed)
+        return [self._messages[i] for i in range(pos, end)], True
@@ -1,5 +1,6 @@
 import 'package:flutter/material.dart';
 import 'package:get/get.dart';
+import 'package:greenai/retry_post.dart';
 import 'package:greenai/url.dart';
 import 'package:http/http.dart' as http;
 import 'dart:convert';
@@ -24,6 +25,12 @@ class _CommunityScreenState extends State<CommunityScreen> with TickerProviderSt
   int onlineMembers = 5;
   bool isLoading = false;
 
+  // Long-poll state: the newest message id seen, and the client whose
+  // pending request is dropped when the screen closes
+  int? _afterId;
+  bool _polling = false;
+  final http.Client _pollClient = http.Client();
+
   // Keep it as "Anonymous" always
   final String currentUserName = "Anonymous";
 
@@ -35,6 +42,7 @@ class _CommunityScreenState extends State<CommunityScreen> with TickerProviderSt
 
   @override
   void dispose() {
+    _pollClient.close();
     _messageController.dispose();
     _scrollController.dispose();
     super.dispose();
@@ -58,8 +66,10 @@ class _CommunityScreenState extends State<CommunityScreen> with TickerProviderSt
             messages = (data['messages'] as List)
                 .map((msg) => CommunityMessage.fromJson(msg))
                 .toList();
+            _afterId = messages.isEmpty ? 0 : messages.last.id;
           });
           _scrollToBottom();
+          _pollMessages();
         }
       } else {
         _showErrorSnackbar('Failed to load messages');
@@ -73,9 +83,51 @@ class _CommunityScreenState extends State<CommunityScreen> with TickerProviderSt
     }
   }
 
+  // Waits on /poll_messages, which answers as soon as a newer message is
+  // posted (or empty after the timeout), and asks again straight away
+  Future<void> _pollMessages() async {
+    if (_polling) return;
+    _polling = true;
+    try {
+      while (mounted) {
+        try {
+          final response = await _pollClient.get(
+            Uri.parse('$baseUrl/poll_messages?after_id=$_afterId&timeout=25'),
+            headers: {'Content-Type': 'application/json'},
+          ).timeout(const Duration(seconds: 40));
+          if (!mounted) return;
+          if (response.statusCode != 200) {
+            await Future.delayed(const Duration(seconds: 5));
+            continue;
+          }
+          final data = json.decode(response.body);
+          if (data['status'] != 'success') continue;
+          final known = messages.map((msg) => msg.id).toSet();
+          final fresh = (data['messages'] as List)
+              .map((msg) => CommunityMessage.fromJson(msg))
+              .where((msg) => !known.contains(msg.id))
+              .toList();
+          _afterId = data['after_id'];
+          if (fresh.isNotEmpty) {
+            setState(() {
+              messages.addAll(fresh);
+            });
+            _scrollToBottom();
+          }
+        } catch (e) {
+          // Offline or closed: back off, then resume from the same id
+          if (!mounted) return;
+          await Future.delayed(const Duration(seconds: 5));
+        }
+      }
+    } finally {
+      _polling = false;
+    }
+  }
+
   Future<void> _sendMessageToServer(String message) async {
     try {
-      final response = await http.post(
+      final response = await postWithRetry(
         Uri.parse('$baseUrl/send_message'),
         headers: {'Content-Type': 'application/json'},
         body: json.encode({
@@ -89,6 +141,8 @@ class _CommunityScreenState extends State<CommunityScreen> with TickerProviderSt
         if (data['status'] == 'success') {
           // Add message to local list
           final newMessage = CommunityMessage.fromJson(data['data']);
+          // The long-poll may have delivered it already
+          if (messages.any((msg) => msg.id == newMessage.id)) return;
           setState(() {
             messages.add(newMessage);
           });
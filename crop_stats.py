@@ -0,0 +1,72 @@
+"""Normalized crop and region keys for the farmer aggregates.
+
+UserDetails.crops is free text ("Paddy, tomato ,") and location is a
+"lat,lon" string. These helpers turn a profile into the (crop, region)
+keys stored in user_crops and counted in crop_region_counts. Regions are
+fixed REGION_CELL_DEGREES grid cells named by their south-west corner;
+changing the cell size needs `flask crop-stats-rebuild`.
+"""
+import math
+
+
+REGION_CELL_DEGREES = 0.5
+UNKNOWN_REGION = 'unknown'
+ALL_CROPS = '*'  # per-region farmer totals, whatever they grow
+MAX_CROP_LENGTH = 64
+
+
+def parse_crops(text):
+    """Distinct lower-cased crop names, in the order given."""
+    crops = []
+    for part in (text or '').split(','):
+        crop = ' '.join(part.lower().split())[:MAX_CROP_LENGTH]
+        if crop and crop != ALL_CROPS and crop not in crops:
+            crops.append(crop)
+    return crops
+
+
+def parse_location(text):
+    """(lat, lon) from a "lat,lon" string, or None if it isn't one."""
+    try:
+        lat, lon = (float(part) for part in (text or '').split(','))
+    except ValueError:
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return None
+    return lat, lon
+
+
+def region_cell(lat, lon):
+    return (math.floor(lat / REGION_CELL_DEGREES), math.floor(lon / REGION_CELL_DEGREES))
+
+
+def region_name(cell):
+    return f"{cell[0] * REGION_CELL_DEGREES:.1f},{cell[1] * REGION_CELL_DEGREES:.1f}"
+
+
+def region_of(location):
+    point = parse_location(location)
+    return region_name(region_cell(*point)) if point else UNKNOWN_REGION
+
+
+def nearby_regions(lat, lon, radius=1):
+    """Names of the cells within radius cells of (lat, lon), including its own."""
+    row, col = region_cell(lat, lon)
+    return [region_name((row + dr, col + dc))
+            for dr in range(-radius, radius + 1) for dc in range(-radius, radius + 1)]
+
+
+def profile_keys(crops, location):
+    """(crop, region) keys one profile contributes to, plus its ALL_CROPS key."""
+    region = region_of(location)
+    return [(crop, region) for crop in parse_crops(crops)] + [(ALL_CROPS, region)]
+
+
+def count_changes(old_keys, new_keys):
+    """{key: +1/-1} turning the counts for old_keys into those for new_keys."""
+    changes = {}
+    for key in old_keys:
+        changes[key] = changes.get(key, 0) - 1
+    for key in new_keys:
+        changes[key] = changes.get(key, 0) + 1
+    return {key: change for key, change in changes.items() if change}
@@ -0,0 +1,122 @@
+"""Connection pool settings and primary/replica routing for the ORM session.
+
+Engines use TimedQueuePool, which reports how long every checkout waited
+for a connection. Views marked read-only send the session's queries to a
+replica; flushes and INSERT/UPDATE/DELETE statements always go to the
+primary. A client that has just written is kept on the primary for a few
+seconds (read-your-writes), since replicas apply changes with some lag;
+the client carries the time of its last write, so every worker knows.
+"""
+from itertools import count
+import time
+
+from flask_sqlalchemy.session import Session
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+from ttl_cache import TTLCache
+
+
+REPLICA_BIND_PREFIX = 'replica'
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that passes (pool, seconds waited) to on_wait after each checkout.
+
+    Pools are told apart by pool_logging_name, which recreate() keeps.
+    """
+
+    on_wait = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            if TimedQueuePool.on_wait is not None:
+                TimedQueuePool.on_wait(self, time.perf_counter() - started)
+
+
+def is_memory_sqlite(uri):
+    url = make_url(uri)
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def engine_options(uri, name, pool_size=10, max_overflow=20, recycle=1800, timeout=10, pre_ping=True):
+    """create_engine() keyword arguments for one bind.
+
+    In-memory SQLite gets none: Flask-SQLAlchemy pins it to a StaticPool,
+    which takes no sizing options.
+    """
+    if is_memory_sqlite(uri):
+        return {}
+    return {
+        'poolclass': TimedQueuePool,
+        'pool_logging_name': name,
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_recycle': recycle,
+        'pool_timeout': timeout,
+        'pool_pre_ping': pre_ping,
+    }
+
+
+def pool_status(engine):
+    """{state: connections} for a TimedQueuePool engine, else {}."""
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return {}
+    return {'checked_out': pool.checkedout(), 'idle': pool.checkedin(),
+            'overflow': max(0, pool.overflow()), 'size': pool.size()}
+
+
+class ReplicaRouter:
+    """Picks a replica bind for read-only requests, round-robin.
+
+    A client stays on the primary for sticky_seconds after a write, which
+    should exceed the usual replica lag. The write time it sends back
+    (wrote_at, from the clock() of whichever worker took the write) works
+    across processes; stick(key) is a per-process record for clients that
+    don't send it.
+    """
+
+    def __init__(self, bind_keys, sticky_seconds=10, max_clients=10000, clock=time.time):
+        self.bind_keys = tuple(bind_keys)
+        self.sticky_seconds = sticky_seconds
+        self.clock = clock
+        self._next = count()
+        self._sticky = TTLCache(max_size=max_clients, ttl=sticky_seconds)
+
+    def __bool__(self):
+        return bool(self.bind_keys)
+
+    def stick(self, key):
+        if key:
+            self._sticky.set(key, True)
+
+    def is_sticky(self, key, wrote_at=None):
+        # abs(): worker clocks may differ a little; NaN compares False
+        if wrote_at is not None and abs(self.clock() - wrote_at) < self.sticky_seconds:
+            return True
+        return bool(key) and self._sticky.get(key, False)
+
+    def pick(self, key=None, wrote_at=None):
+        """Bind key to read from, or None to use the primary."""
+        if not self.bind_keys or self.is_sticky(key, wrote_at):
+            return None
+        return self.bind_keys[next(self._next) % len(self.bind_keys)]
+
+
+class RoutingSession(Session):
+    """Session that reads from info['read_bind'] when a view has set one.
+
+    Flushes and DML statements keep going to the primary, so a read-only
+    view that writes after all still writes to the right server.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        read_bind = self.info.get('read_bind')
+        if (bind is None and read_bind is not None and not self._flushing
+                and not getattr(clause, 'is_dml', False)):
+            return self._db.engines[read_bind]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
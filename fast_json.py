@@ -0,0 +1,26 @@
+"""JSON encoding for large list responses.
+
+Uses orjson when it is installed and the standard library otherwise. Both
+paths serialize datetime/date values as isoformat() strings, so callers
+can hand over raw column values instead of formatting each row.
+"""
+from datetime import date, datetime, time
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(payload):
+    """Serialize payload to compact JSON bytes with sorted keys, like jsonify."""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SORT_KEYS | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(payload, default=_default, sort_keys=True, separators=(',', ':')) + '\n').encode()
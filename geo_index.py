@@ -0,0 +1,59 @@
+"""Grid bucketing for nearby-user queries.
+
+The globe is cut into CELL_DEGREES squares numbered row-major, so the
+cells of one grid row are consecutive integers. A radius query covers its
+bounding box with one BETWEEN range per row over an indexed `cell`
+column, then filters the candidates by exact haversine distance.
+"""
+import math
+
+
+EARTH_RADIUS_KM = 6371.0088
+CELL_DEGREES = 0.05  # about 5.5 km north-south
+ROWS = round(180 / CELL_DEGREES)
+COLUMNS = round(360 / CELL_DEGREES)
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _row(lat):
+    return min(ROWS - 1, max(0, math.floor((lat + 90) / CELL_DEGREES)))
+
+
+def _column(lon):
+    return math.floor((lon + 180) / CELL_DEGREES) % COLUMNS
+
+
+def cell_of(lat, lon):
+    return _row(lat) * COLUMNS + _column(lon)
+
+
+def cell_ranges(lat, lon, radius_km):
+    """Inclusive (low, high) cell ranges covering every point within radius_km."""
+    lat_delta = math.degrees(radius_km / EARTH_RADIUS_KM)
+    south, north = lat - lat_delta, lat + lat_delta
+    # Widest longitude span is at the latitude edge nearest a pole
+    widest = min(90.0, max(abs(south), abs(north)))
+    cos_lat = math.cos(math.radians(widest))
+    if north >= 90 or south <= -90 or cos_lat < 1e-9:
+        lon_delta = 180.0
+    else:
+        lon_delta = min(180.0, lat_delta / cos_lat)
+
+    if lon_delta >= 180:
+        spans = [(0, COLUMNS - 1)]
+    else:
+        first, last = _column(lon - lon_delta), _column(lon + lon_delta)
+        # Split at the antimeridian
+        spans = [(first, last)] if first <= last else [(first, COLUMNS - 1), (0, last)]
+
+    ranges = []
+    for row in range(_row(south), _row(north) + 1):
+        base = row * COLUMNS
+        ranges.extend((base + low, base + high) for low, high in spans)
+    return ranges
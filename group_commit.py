@@ -0,0 +1,87 @@
+from threading import Condition, Event, Thread
+import time
+
+
+class PendingWrite:
+    __slots__ = ('row', 'done', 'result', 'error')
+
+    def __init__(self, row):
+        self.row = row
+        self.done = Event()
+        self.result = None
+        self.error = None
+
+
+class GroupCommitWriter:
+    """Collects rows from many request threads and commits them in batches.
+
+    A single writer thread waits for the first pending row, keeps gathering
+    for up to max_delay seconds or until max_rows are queued, then hands the
+    whole batch to write_batch(rows) -> ids, which must insert and commit
+    them in one transaction. Every submitter blocks until its batch commits
+    and gets its own id back.
+
+    Crash semantics: submit() only returns after the commit, so a caller
+    that got an id has a durable row. If the process dies first, the
+    queued and in-flight rows are lost, but none of them were
+    acknowledged. A caller that times out may still see its row committed
+    later. If a batch fails, its rows are retried one at a time so a
+    single bad row fails only its own caller.
+    """
+
+    def __init__(self, write_batch, max_rows=100, max_delay=0.005, timeout=10):
+        self.write_batch = write_batch
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.batches = 0
+        self.rows = 0
+        self._pending = []
+        self._cond = Condition()
+        self._thread = None
+
+    def submit(self, row):
+        """Queue row and wait for its batch to commit. Returns the row's id."""
+        pending = PendingWrite(row)
+        with self._cond:
+            if self._thread is None:
+                self._thread = Thread(target=self._run, name='group-commit-writer', daemon=True)
+                self._thread.start()
+            self._pending.append(pending)
+            self._cond.notify()
+        if not pending.done.wait(self.timeout):
+            raise TimeoutError("Timed out waiting for group commit")
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _take_batch(self):
+        with self._cond:
+            self._cond.wait_for(lambda: self._pending)
+            deadline = time.monotonic() + self.max_delay
+            while len(self._pending) < self.max_rows:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch = self._pending[:self.max_rows]
+            del self._pending[:self.max_rows]
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            try:
+                ids = self.write_batch([pending.row for pending in batch])
+                for pending, row_id in zip(batch, ids):
+                    pending.result = row_id
+            except Exception:
+                for pending in batch:
+                    try:
+                        pending.result = self.write_batch([pending.row])[0]
+                    except Exception as e:
+                        pending.error = e
+            self.batches += 1
+            self.rows += len(batch)
+            for pending in batch:
+                pending.done.set()
@@ -0,0 +1,43 @@
+"""Gunicorn settings; run `gunicorn` from this directory to pick them up.
+
+With preload_app the master imports and builds the app once and forks
+the workers from it: a new worker starts without paying for the imports,
+and the workers share the master's memory copy-on-write.
+
+Workers are threaded (gthread): /poll_messages and /stream_messages hold
+their request for up to a poll timeout or a whole stream, and a sync
+worker would be tied up by a single waiting client. A waiting request
+releases its database connection, so threads can exceed the pool size.
+"""
+import gc
+import multiprocessing
+import os
+
+
+wsgi_app = 'greenai_app:create_app()'
+bind = os.environ.get('GREENAI_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('GREENAI_WORKERS', str(multiprocessing.cpu_count() * 2 + 1)))
+worker_class = 'gthread'
+threads = int(os.environ.get('GREENAI_THREADS', '32'))
+preload_app = os.environ.get('GREENAI_PRELOAD', '1') == '1'
+
+
+def when_ready(server):
+    if not server.cfg.preload_app:
+        return
+    import greenai_app
+    greenai_app.warm_up(server.app.wsgi())
+    # Objects that exist now are never collected; freezing them keeps the
+    # workers' collections from writing to (and so copying) shared pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    if not server.cfg.preload_app:
+        return
+    import greenai_app
+    # Pooled connections must not be shared between processes; drop any the
+    # master opened without closing them under its feet
+    with server.app.wsgi().app_context():
+        for engine in greenai_app.db.engines.values():
+            engine.dispose(close=False)
@@ -0,0 +1,234 @@
+"""Idempotency-Key bookkeeping for retried POSTs.
+
+begin(key, fingerprint) decides what a request carrying a key should do:
+
+    ('execute', None)    first time seen: run the handler, then complete()
+                         (or abort() if it failed)
+    ('replay', stored)   already handled: send stored back unchanged
+    ('mismatch', None)   the key was used with a different request body
+    ('in_progress', None) another execution didn't finish within wait
+
+Only the first request runs the handler; duplicates arriving while it
+runs wait for its result.
+"""
+from collections import OrderedDict
+from threading import Condition
+import hashlib
+import time
+
+from sqlalchemy import Column, Double, Integer, LargeBinary, MetaData, String, Table
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.dialects.mysql import MEDIUMBLOB
+from sqlalchemy.exc import IntegrityError
+
+
+class StoredResponse:
+    __slots__ = ('status', 'body', 'mimetype')
+
+    def __init__(self, status, body, mimetype):
+        self.status = status
+        self.body = body
+        self.mimetype = mimetype
+
+
+class IdempotencyStore:
+    def __init__(self, ttl=24 * 3600, max_size=10000, wait=30, clock=time.time):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.wait = wait
+        self.clock = clock
+
+    def begin(self, key, fingerprint):
+        raise NotImplementedError
+
+    def complete(self, key, stored):
+        raise NotImplementedError
+
+    def abort(self, key):
+        """Forget a failed execution so the client's retry runs again."""
+        raise NotImplementedError
+
+
+class MemoryIdempotencyStore(IdempotencyStore):
+    """Per-process store: an LRU of at most max_size keys, each kept ttl seconds.
+
+    Entries are [fingerprint, stored, expires_at]; stored is None while the
+    first execution is running, and waiters block on a shared Condition.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._entries = OrderedDict()
+        self._cond = Condition()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _evict(self, now):
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry[2] > now and len(self._entries) <= self.max_size:
+                break
+            self._entries.popitem(last=False)
+
+    def begin(self, key, fingerprint):
+        now = self.clock()
+        deadline = time.monotonic() + self.wait
+        with self._cond:
+            self._evict(now)
+            entry = self._entries.get(key)
+            if entry is None or entry[2] <= now:
+                self._entries[key] = [fingerprint, None, now + self.ttl]
+                self._entries.move_to_end(key)
+                return 'execute', None
+            while True:
+                if entry[0] != fingerprint:
+                    return 'mismatch', None
+                if entry[1] is not None:
+                    return 'replay', entry[1]
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return 'in_progress', None
+                self._cond.wait(remaining)
+                current = self._entries.get(key)
+                if current is None or current[2] <= self.clock():
+                    # The execution failed (or expired) and nobody has taken
+                    # over yet; this request runs instead
+                    self._entries[key] = [fingerprint, None, self.clock() + self.ttl]
+                    self._entries.move_to_end(key)
+                    return 'execute', None
+                # Still running, or another waiter took over: wait on that
+                entry = current
+
+    def complete(self, key, stored):
+        with self._cond:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry[1] = stored
+                entry[2] = self.clock() + self.ttl
+                self._entries.move_to_end(key)
+            self._cond.notify_all()
+
+    def abort(self, key):
+        with self._cond:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] is None:
+                del self._entries[key]
+            self._cond.notify_all()
+
+    def remember(self, key, fingerprint, stored, expires_at):
+        """Insert an already-completed response (used as a cache in front of the DB)."""
+        with self._cond:
+            self._entries[key] = [fingerprint, stored, expires_at]
+            self._entries.move_to_end(key)
+            self._evict(self.clock())
+
+
+idempotency_metadata = MetaData()
+
+idempotency_keys = Table(
+    'idempotency_keys', idempotency_metadata,
+    Column('key_hash', String(64), primary_key=True),
+    Column('fingerprint', String(64), nullable=False),
+    Column('status', Integer, nullable=True),  # NULL while the first execution runs
+    # MySQL's plain BLOB holds only 64 KB
+    Column('body', LargeBinary().with_variant(MEDIUMBLOB(), 'mysql', 'mariadb'), nullable=True),
+    Column('mimetype', String(100), nullable=True),
+    Column('started_at', Double, nullable=False),
+    Column('expires_at', Double, nullable=False, index=True),
+)
+
+
+class DatabaseIdempotencyStore(IdempotencyStore):
+    """Store shared by every worker through an `idempotency_keys` table.
+
+    The first request claims a key by inserting its row; the primary key
+    makes that race-free across processes. Completed responses are also
+    kept in a per-process MemoryIdempotencyStore, so replays in the same
+    process don't read the table. A claim whose process died is taken over
+    after `wait` seconds. The table is created by migration 10
+    (`flask db-upgrade`).
+    """
+
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, get_engine, **kwargs):
+        super().__init__(**kwargs)
+        self.get_engine = get_engine
+        self._local = MemoryIdempotencyStore(ttl=self.ttl, max_size=self.max_size, wait=0, clock=self.clock)
+        self._last_sweep = self.clock()
+
+    @staticmethod
+    def _hash(key):
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def _sweep(self, now):
+        if now - self._last_sweep >= 60:
+            self._last_sweep = now
+            with self.get_engine().begin() as conn:
+                conn.execute(delete(idempotency_keys).where(idempotency_keys.c.expires_at <= now))
+
+    def begin(self, key, fingerprint):
+        outcome, stored = self._local.begin(key, fingerprint)
+        if outcome in ('replay', 'mismatch'):
+            return outcome, stored
+        if outcome == 'in_progress':
+            # Running in this process; wait for it like any other duplicate
+            return self._wait_for(key, fingerprint)
+
+        now = self.clock()
+        self._sweep(now)
+        key_hash = self._hash(key)
+        try:
+            with self.get_engine().begin() as conn:
+                conn.execute(delete(idempotency_keys).where(
+                    idempotency_keys.c.key_hash == key_hash, idempotency_keys.c.expires_at <= now))
+                conn.execute(insert(idempotency_keys).values(
+                    key_hash=key_hash, fingerprint=fingerprint, started_at=now, expires_at=now + self.ttl))
+            return 'execute', None
+        except IntegrityError:
+            pass
+        self._local.abort(key)
+        return self._wait_for(key, fingerprint)
+
+    def _wait_for(self, key, fingerprint):
+        key_hash = self._hash(key)
+        deadline = time.monotonic() + self.wait
+        while True:
+            with self.get_engine().connect() as conn:
+                row = conn.execute(select(idempotency_keys).where(idempotency_keys.c.key_hash == key_hash)).first()
+            now = self.clock()
+            if row is None:
+                return self.begin(key, fingerprint)
+            if row.fingerprint != fingerprint:
+                return 'mismatch', None
+            if row.status is not None:
+                stored = StoredResponse(row.status, row.body, row.mimetype)
+                self._local.remember(key, fingerprint, stored, row.expires_at)
+                return 'replay', stored
+            if now - row.started_at >= self.wait:
+                # The claiming process never finished; take the key over
+                with self.get_engine().begin() as conn:
+                    claimed = conn.execute(update(idempotency_keys).where(
+                        idempotency_keys.c.key_hash == key_hash,
+                        idempotency_keys.c.status.is_(None),
+                        idempotency_keys.c.started_at == row.started_at
+                    ).values(started_at=now)).rowcount
+                if claimed:
+                    return 'execute', None
+            if time.monotonic() >= deadline:
+                return 'in_progress', None
+            time.sleep(self.POLL_INTERVAL)
+
+    def complete(self, key, stored):
+        now = self.clock()
+        with self.get_engine().begin() as conn:
+            conn.execute(update(idempotency_keys).where(idempotency_keys.c.key_hash == self._hash(key)).values(
+                status=stored.status, body=stored.body, mimetype=stored.mimetype, expires_at=now + self.ttl))
+        self._local.complete(key, stored)
+
+    def abort(self, key):
+        with self.get_engine().begin() as conn:
+            conn.execute(delete(idempotency_keys).where(
+                idempotency_keys.c.key_hash == self._hash(key), idempotency_keys.c.status.is_(None)))
+        self._local.abort(key)
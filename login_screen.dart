@@ -1,5 +1,6 @@
 import 'package:flutter/material.dart';
 import 'package:get/get.dart';
+import 'package:greenai/session.dart';
 import 'package:greenai/url.dart';
 import 'package:http/http.dart' as http;
 import 'dart:convert';
@@ -32,7 +33,7 @@ class _LoginScreenState extends State<LoginScreen> {
     final response = await http.post(url,
         headers: {'Content-Type': 'application/json'},
         body: jsonEncode({"email": email}));
-    if (response.statusCode == 200) {
+    if (response.statusCode == 200 || response.statusCode == 202) {
       var data = jsonDecode(response.body);
       return data['status'] == 'success';
     }
@@ -46,6 +47,7 @@ class _LoginScreenState extends State<LoginScreen> {
         body: jsonEncode({"email": email, "otp": otp}));
     if (response.statusCode == 200) {
       var data = jsonDecode(response.body);
+      await Session.save(data['token']);
       return data['status'] == 'success';
     }
     return false;
@@ -0,0 +1,179 @@
+from collections import deque
+import queue
+import threading
+import time
+
+
+class MailOutbox:
+    """Background queue that delivers email over long-lived SMTP connections.
+
+    Each worker thread keeps its own authenticated connection open and
+    reuses it for every message, so STARTTLS and login happen once per
+    connection instead of once per email. Failed sends are retried with
+    exponential backoff; a dropped connection is reopened transparently.
+
+    observe, if given, is called as observe(operation, seconds) for each
+    'connect' (including STARTTLS and login) and 'send'.
+
+    Delivery is at-most-once from the caller's point of view: submit()
+    returns as soon as the message is queued, and messages still queued
+    when the process exits are lost.
+    """
+
+    def __init__(self, server, port, address, password=None, workers=2,
+                 use_tls=True, max_queue=1000, max_retries=3, backoff=0.5,
+                 idle_timeout=60, connect_timeout=10, observe=None):
+        self.server = server
+        self.port = port
+        self.address = address
+        self.password = password
+        self.workers = workers
+        self.use_tls = use_tls
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.idle_timeout = idle_timeout
+        self.connect_timeout = connect_timeout
+        self.observe = observe
+        self.sent = 0
+        self.failed = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._threads = []
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+    def submit(self, to_email, body):
+        """Queue a message for delivery. Returns False if the outbox is full."""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((to_email, body))
+            return True
+        except queue.Full:
+            return False
+
+    def join(self):
+        """Block until every queued message has been attempted."""
+        self._queue.join()
+
+    def stop(self):
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def _ensure_started(self):
+        if self._threads:
+            return
+        with self._start_lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"mail-outbox-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _connect(self):
+        import smtplib
+        started = time.perf_counter()
+        server = smtplib.SMTP(self.server, self.port, timeout=self.connect_timeout)
+        if self.use_tls:
+            server.starttls()
+        if self.password:
+            server.login(self.address, self.password)
+        if self.observe:
+            self.observe('connect', time.perf_counter() - started)
+        return server
+
+    def _close(self, server):
+        if server is None:
+            return
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    def _run(self):
+        # Imported by the delivery threads, so processes that never send
+        # mail don't load it
+        import smtplib
+        server = None
+        last_used = 0.0
+        while True:
+            try:
+                item = self._queue.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                # Let an idle connection go rather than have the server drop it
+                self._close(server)
+                server = None
+                continue
+
+            if item is None:
+                self._close(server)
+                self._queue.task_done()
+                return
+
+            to_email, body = item
+            if server is not None and time.monotonic() - last_used > self.idle_timeout:
+                self._close(server)
+                server = None
+
+            delivered = False
+            for attempt in range(self.max_retries + 1):
+                try:
+                    if server is None:
+                        server = self._connect()
+                    started = time.perf_counter()
+                    server.sendmail(self.address, to_email, body)
+                    if self.observe:
+                        self.observe('send', time.perf_counter() - started)
+                    delivered = True
+                    break
+                except smtplib.SMTPRecipientsRefused as e:
+                    print(f"Error sending email to {to_email}: {e}")
+                    break
+                except Exception as e:
+                    print(f"Error sending email (attempt {attempt + 1}): {e}")
+                    self._close(server)
+                    server = None
+                    if attempt < self.max_retries:
+                        time.sleep(self.backoff * (2 ** attempt))
+
+            last_used = time.monotonic()
+            with self._stats_lock:
+                if delivered:
+                    self.sent += 1
+                else:
+                    self.failed += 1
+            self._queue.task_done()
+
+
+class StubOutbox:
+    """MailOutbox stand-in that keeps messages in memory instead of sending.
+
+    Used for local runs and load tests (GREENAI_MAIL_BACKEND=stub).
+    """
+
+    def __init__(self, max_messages=1000):
+        self.messages = deque(maxlen=max_messages)
+        self.sent = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+
+    def submit(self, to_email, body):
+        with self._lock:
+            self.messages.append((to_email, body))
+            self.sent += 1
+        return True
+
+    def last_message(self, to_email):
+        with self._lock:
+            for recipient, body in reversed(self.messages):
+                if recipient == to_email:
+                    return body
+        return None
+
+    def join(self):
+        pass
+
+    def stop(self):
+        pass
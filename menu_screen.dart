@@ -1,5 +1,6 @@
 import 'package:flutter/material.dart';
 import 'package:get/get.dart';
+import 'package:greenai/session.dart';
 
 class MenuScreen extends StatelessWidget {
   const MenuScreen({super.key});
@@ -432,6 +433,7 @@ class MenuScreen extends StatelessWidget {
           ElevatedButton(
             onPressed: () {
               Navigator.pop(context);
+              Session.logout();
               Get.snackbar(
                 'Logged Out',
                 'You have been successfully logged out',
@@ -0,0 +1,358 @@
+"""Versioned schema migrations for existing GreenAI databases.
+
+db.create_all() only creates missing tables, so indexes and constraints
+added to the models later have to be applied to a live database here.
+Each migration is idempotent and recorded in `schema_migrations`.
+
+    flask --app greenai_app db-upgrade
+    flask --app greenai_app db-downgrade 0
+
+A database created from scratch with db.create_all() already has every
+index; mark it as current with `flask --app greenai_app db-stamp`.
+"""
+from datetime import datetime
+
+import crop_stats
+import geo_index
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table
+from sqlalchemy import inspect, insert, delete, select, text
+
+
+schema_metadata = MetaData()
+
+schema_migrations = Table(
+    'schema_migrations', schema_metadata,
+    Column('version', Integer, primary_key=True, autoincrement=False),
+    Column('description', String(255), nullable=False),
+    Column('applied_at', DateTime, nullable=False),
+)
+
+
+class Migration:
+    def __init__(self, version, description, upgrade, downgrade):
+        self.version = version
+        self.description = description
+        self.upgrade = upgrade
+        self.downgrade = downgrade
+
+
+def has_index(conn, table, name):
+    return any(index['name'] == name for index in inspect(conn).get_indexes(table))
+
+
+def create_index(conn, table, name, columns, unique=False):
+    if has_index(conn, table, name):
+        return
+    kind = 'UNIQUE INDEX' if unique else 'INDEX'
+    conn.execute(text(f"CREATE {kind} {name} ON {table} ({', '.join(columns)})"))
+
+
+def drop_index(conn, table, name):
+    if not has_index(conn, table, name):
+        return
+    if conn.dialect.name == 'mysql':
+        conn.execute(text(f"DROP INDEX {name} ON {table}"))
+    else:
+        conn.execute(text(f"DROP INDEX {name}"))
+
+
+def has_column(conn, table, name):
+    return any(column['name'] == name for column in inspect(conn).get_columns(table))
+
+
+def has_table(conn, table):
+    return inspect(conn).has_table(table)
+
+
+def _chat_messages_up(conn):
+    create_index(conn, 'chat_messages', 'ix_chat_messages_timestamp_id', ['timestamp', 'id'])
+
+
+def _chat_messages_down(conn):
+    drop_index(conn, 'chat_messages', 'ix_chat_messages_timestamp_id')
+
+
+def _unique_emails_up(conn):
+    # Duplicate active rows carry no data beyond the email; keep the newest
+    conn.execute(text(
+        "DELETE FROM active WHERE id NOT IN "
+        "(SELECT keep_id FROM (SELECT MAX(id) AS keep_id FROM active GROUP BY email) AS keep)"
+    ))
+
+    duplicates = conn.execute(text(
+        "SELECT email FROM userdetails GROUP BY email HAVING COUNT(*) > 1"
+    )).scalars().all()
+    if duplicates:
+        raise RuntimeError(
+            f"userdetails has {len(duplicates)} duplicated emails (e.g. {', '.join(duplicates[:5])}); "
+            "merge them before adding the unique index"
+        )
+
+    create_index(conn, 'active', 'ux_active_email', ['email'], unique=True)
+    create_index(conn, 'userdetails', 'ux_userdetails_email', ['email'], unique=True)
+
+
+def _unique_emails_down(conn):
+    drop_index(conn, 'userdetails', 'ux_userdetails_email')
+    drop_index(conn, 'active', 'ux_active_email')
+
+
+def _reminders_up(conn):
+    create_index(conn, 'reminders', 'ix_reminders_user_active_date_time',
+                 ['user_id', 'is_active', 'date', 'time'])
+
+
+def _reminders_down(conn):
+    drop_index(conn, 'reminders', 'ix_reminders_user_active_date_time')
+
+
+def _reminders_updated_at_up(conn):
+    create_index(conn, 'reminders', 'ix_reminders_updated_at', ['updated_at'])
+
+
+def _reminders_updated_at_down(conn):
+    drop_index(conn, 'reminders', 'ix_reminders_updated_at')
+
+
+def _sentiment_up(conn):
+    if not has_column(conn, 'chat_messages', 'sentiment'):
+        conn.execute(text("ALTER TABLE chat_messages ADD COLUMN sentiment FLOAT NULL"))
+    if not has_table(conn, 'chat_sentiment_rollups'):
+        conn.execute(text(
+            "CREATE TABLE chat_sentiment_rollups ("
+            "bucket_start DATETIME NOT NULL PRIMARY KEY, "
+            "messages INTEGER NOT NULL, "
+            "polarity_sum FLOAT NOT NULL, "
+            "positive INTEGER NOT NULL, "
+            "negative INTEGER NOT NULL, "
+            "neutral INTEGER NOT NULL)"
+        ))
+
+
+def _sentiment_down(conn):
+    if has_table(conn, 'chat_sentiment_rollups'):
+        conn.execute(text("DROP TABLE chat_sentiment_rollups"))
+    if has_column(conn, 'chat_messages', 'sentiment'):
+        conn.execute(text("ALTER TABLE chat_messages DROP COLUMN sentiment"))
+
+
+def _chat_archive_up(conn):
+    if not has_table(conn, 'chat_messages_archive'):
+        conn.execute(text(
+            "CREATE TABLE chat_messages_archive ("
+            "id INTEGER NOT NULL PRIMARY KEY, "
+            "name VARCHAR(255) NOT NULL, "
+            "message TEXT NOT NULL, "
+            "timestamp DATETIME NOT NULL, "
+            "sentiment FLOAT NULL)"
+        ))
+    create_index(conn, 'chat_messages_archive', 'ix_chat_messages_archive_timestamp_id', ['timestamp', 'id'])
+
+
+def _chat_archive_down(conn):
+    if has_table(conn, 'chat_messages_archive'):
+        conn.execute(text("DROP TABLE chat_messages_archive"))
+
+
+def _crop_stats_up(conn):
+    if not has_table(conn, 'user_crops'):
+        conn.execute(text(
+            "CREATE TABLE user_crops ("
+            "user_id INTEGER NOT NULL, "
+            f"crop VARCHAR({crop_stats.MAX_CROP_LENGTH}) NOT NULL, "
+            "region VARCHAR(32) NOT NULL, "
+            "PRIMARY KEY (user_id, crop))"
+        ))
+    create_index(conn, 'user_crops', 'ix_user_crops_crop_region', ['crop', 'region'])
+    if not has_table(conn, 'crop_region_counts'):
+        conn.execute(text(
+            "CREATE TABLE crop_region_counts ("
+            f"crop VARCHAR({crop_stats.MAX_CROP_LENGTH}) NOT NULL, "
+            "region VARCHAR(32) NOT NULL, "
+            "farmers INTEGER NOT NULL, "
+            "PRIMARY KEY (crop, region))"
+        ))
+
+    # Backfill from the existing profiles (the only full scan of userdetails)
+    conn.execute(text("DELETE FROM user_crops"))
+    conn.execute(text("DELETE FROM crop_region_counts"))
+    user_rows, totals = [], {}
+    for user_id, crops, location in conn.execute(text("SELECT id, crops, location FROM userdetails")):
+        for crop, region in crop_stats.profile_keys(crops, location):
+            totals[(crop, region)] = totals.get((crop, region), 0) + 1
+            if crop != crop_stats.ALL_CROPS:
+                user_rows.append({'user_id': user_id, 'crop': crop, 'region': region})
+    if user_rows:
+        conn.execute(text("INSERT INTO user_crops (user_id, crop, region) VALUES (:user_id, :crop, :region)"),
+                     user_rows)
+    if totals:
+        conn.execute(text("INSERT INTO crop_region_counts (crop, region, farmers) VALUES (:crop, :region, :farmers)"),
+                     [{'crop': crop, 'region': region, 'farmers': farmers}
+                      for (crop, region), farmers in totals.items()])
+
+
+def _crop_stats_down(conn):
+    for table in ('crop_region_counts', 'user_crops'):
+        if has_table(conn, table):
+            conn.execute(text(f"DROP TABLE {table}"))
+
+
+def _user_locations_up(conn):
+    if not has_table(conn, 'user_locations'):
+        conn.execute(text(
+            "CREATE TABLE user_locations ("
+            "user_id INTEGER NOT NULL PRIMARY KEY, "
+            "lat FLOAT NOT NULL, "
+            "lon FLOAT NOT NULL, "
+            "cell INTEGER NOT NULL)"
+        ))
+    create_index(conn, 'user_locations', 'ix_user_locations_cell', ['cell'])
+
+    conn.execute(text("DELETE FROM user_locations"))
+    rows = []
+    for user_id, location in conn.execute(text("SELECT id, location FROM userdetails")):
+        point = crop_stats.parse_location(location)
+        if point is not None:
+            rows.append({'user_id': user_id, 'lat': point[0], 'lon': point[1], 'cell': geo_index.cell_of(*point)})
+    if rows:
+        conn.execute(text("INSERT INTO user_locations (user_id, lat, lon, cell) VALUES (:user_id, :lat, :lon, :cell)"),
+                     rows)
+
+
+def _user_locations_down(conn):
+    if has_table(conn, 'user_locations'):
+        conn.execute(text("DROP TABLE user_locations"))
+
+
+def _reminders_user_updated_at_up(conn):
+    create_index(conn, 'reminders', 'ix_reminders_user_updated_at', ['user_id', 'updated_at'])
+
+
+def _reminders_user_updated_at_down(conn):
+    drop_index(conn, 'reminders', 'ix_reminders_user_updated_at')
+
+
+def _store_tables_up(conn):
+    # The stores used to create these on first use, so they may exist already
+    if not has_table(conn, 'sessions'):
+        conn.execute(text(
+            "CREATE TABLE sessions ("
+            "token_hash VARCHAR(64) NOT NULL PRIMARY KEY, "
+            "email VARCHAR(255) NOT NULL, "
+            "expires_at DOUBLE NOT NULL)"
+        ))
+    create_index(conn, 'sessions', 'ix_sessions_email', ['email'])
+    create_index(conn, 'sessions', 'ix_sessions_expires_at', ['expires_at'])
+    if not has_table(conn, 'otp_codes'):
+        conn.execute(text(
+            "CREATE TABLE otp_codes ("
+            "email VARCHAR(255) NOT NULL PRIMARY KEY, "
+            "otp VARCHAR(16) NULL, "
+            "expires_at DOUBLE NOT NULL, "
+            "window_start DOUBLE NOT NULL, "
+            "sends INTEGER NOT NULL, "
+            "purge_at DOUBLE NOT NULL)"
+        ))
+    create_index(conn, 'otp_codes', 'ix_otp_codes_purge_at', ['purge_at'])
+    mysql = conn.dialect.name in ('mysql', 'mariadb')
+    # MySQL's BLOB stops at 64 KB, less than a large batch response
+    blob = 'MEDIUMBLOB' if mysql else 'BLOB'
+    if not has_table(conn, 'idempotency_keys'):
+        conn.execute(text(
+            "CREATE TABLE idempotency_keys ("
+            "key_hash VARCHAR(64) NOT NULL PRIMARY KEY, "
+            "fingerprint VARCHAR(64) NOT NULL, "
+            "status INTEGER NULL, "
+            f"body {blob} NULL, "
+            "mimetype VARCHAR(100) NULL, "
+            "started_at DOUBLE NOT NULL, "
+            "expires_at DOUBLE NOT NULL)"
+        ))
+    create_index(conn, 'idempotency_keys', 'ix_idempotency_keys_expires_at', ['expires_at'])
+
+    if mysql:
+        # Tables created on first use got MySQL's single-precision FLOAT,
+        # which rounds epoch seconds to about two minutes, and a 64 KB BLOB
+        for table, columns in (('sessions', ['expires_at']),
+                               ('otp_codes', ['expires_at', 'window_start', 'purge_at']),
+                               ('idempotency_keys', ['started_at', 'expires_at'])):
+            for column in columns:
+                conn.execute(text(f"ALTER TABLE {table} MODIFY {column} DOUBLE NOT NULL"))
+        conn.execute(text("ALTER TABLE idempotency_keys MODIFY body MEDIUMBLOB NULL"))
+
+
+def _store_tables_down(conn):
+    for table in ('idempotency_keys', 'otp_codes', 'sessions'):
+        if has_table(conn, table):
+            conn.execute(text(f"DROP TABLE {table}"))
+
+
+MIGRATIONS = [
+    Migration(1, 'chat_messages (timestamp, id) index', _chat_messages_up, _chat_messages_down),
+    Migration(2, 'unique email on active and userdetails', _unique_emails_up, _unique_emails_down),
+    Migration(3, 'reminders (user_id, is_active, date, time) index', _reminders_up, _reminders_down),
+    Migration(4, 'reminders (updated_at) index', _reminders_updated_at_up, _reminders_updated_at_down),
+    Migration(5, 'chat_messages.sentiment and hourly sentiment rollups', _sentiment_up, _sentiment_down),
+    Migration(6, 'chat_messages_archive table', _chat_archive_up, _chat_archive_down),
+    Migration(7, 'user_crops and crop_region_counts aggregates', _crop_stats_up, _crop_stats_down),
+    Migration(8, 'user_locations grid index', _user_locations_up, _user_locations_down),
+    Migration(9, 'reminders (user_id, updated_at) index', _reminders_user_updated_at_up,
+              _reminders_user_updated_at_down),
+    Migration(10, 'sessions, otp_codes and idempotency_keys tables', _store_tables_up, _store_tables_down),
+]
+
+
+def applied_versions(engine):
+    schema_metadata.create_all(engine, checkfirst=True)
+    with engine.connect() as conn:
+        return set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+
+def upgrade(engine, target=None):
+    """Apply pending migrations up to target (default: latest). Returns versions applied."""
+    applied = applied_versions(engine)
+    done = []
+    for migration in MIGRATIONS:
+        if target is not None and migration.version > target:
+            break
+        if migration.version in applied:
+            continue
+        with engine.begin() as conn:
+            migration.upgrade(conn)
+            conn.execute(insert(schema_migrations).values(
+                version=migration.version,
+                description=migration.description,
+                applied_at=datetime.utcnow()
+            ))
+        done.append(migration.version)
+    return done
+
+
+def downgrade(engine, target=0):
+    """Revert applied migrations newer than target. Returns versions reverted."""
+    applied = applied_versions(engine)
+    done = []
+    for migration in reversed(MIGRATIONS):
+        if migration.version <= target:
+            break
+        if migration.version not in applied:
+            continue
+        with engine.begin() as conn:
+            migration.downgrade(conn)
+            conn.execute(delete(schema_migrations).where(schema_migrations.c.version == migration.version))
+        done.append(migration.version)
+    return done
+
+
+def stamp(engine):
+    """Record every migration as applied without running it."""
+    applied = applied_versions(engine)
+    with engine.begin() as conn:
+        for migration in MIGRATIONS:
+            if migration.version not in applied:
+                conn.execute(insert(schema_migrations).values(
+                    version=migration.version,
+                    description=migration.description,
+                    applied_at=datetime.utcnow()
+                ))
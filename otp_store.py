@@ -0,0 +1,196 @@
+from collections import OrderedDict
+from threading import Lock
+import time
+
+from sqlalchemy import Column, Double, Integer, MetaData, String, Table
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+
+class OTPStore:
+    """Interface shared by the OTP backends.
+
+    An entry per email holds the current code, its expiry and a send-rate
+    window. issue() refuses new codes once an email has used up
+    max_sends within window seconds. Entries are dropped by sweep() once
+    both the code and the rate window have expired, and the store never
+    holds more than max_size emails.
+
+    window should not exceed ttl; sweeping relies on the newest issue time
+    bounding both expiries.
+    """
+
+    def __init__(self, ttl=600, max_size=100000, max_sends=5, window=600,
+                 sweep_interval=60, clock=time.time):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.max_sends = max_sends
+        self.window = window
+        self.sweep_interval = sweep_interval
+        self.clock = clock
+        self._last_sweep = clock()
+
+    def issue(self, email, otp):
+        """Store otp for email. Returns False if email is rate limited."""
+        raise NotImplementedError
+
+    def verify(self, email, otp):
+        """Consume otp if it matches and has not expired."""
+        raise NotImplementedError
+
+    def sweep(self):
+        """Drop expired entries and enforce max_size."""
+        raise NotImplementedError
+
+    def maybe_sweep(self):
+        now = self.clock()
+        if now - self._last_sweep >= self.sweep_interval:
+            self._last_sweep = now
+            self.sweep()
+
+
+class MemoryOTPStore(OTPStore):
+    """Per-process store. Only correct with a single worker process.
+
+    Entries are kept in issue order, which is also expiry order, so
+    sweeping pops from the front and max_size evicts the least recently
+    issued email. All operations are O(1) apart from the swept entries.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def issue(self, email, otp):
+        self.maybe_sweep()
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry and now - entry['window_start'] < self.window:
+                if entry['sends'] >= self.max_sends:
+                    return False
+                entry['sends'] += 1
+            else:
+                entry = {'window_start': now, 'sends': 1}
+            entry['otp'] = otp
+            entry['expires_at'] = now + self.ttl
+            self._entries[email] = entry
+            self._entries.move_to_end(email)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            return True
+
+    def verify(self, email, otp):
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(email)
+            if not entry or entry['otp'] is None or entry['otp'] != otp:
+                return False
+            if now >= entry['expires_at']:
+                return False
+            # Keep the entry so the send-rate window still applies
+            entry['otp'] = None
+            return True
+
+    def sweep(self):
+        now = self.clock()
+        with self._lock:
+            while self._entries:
+                email, entry = next(iter(self._entries.items()))
+                if max(entry['expires_at'], entry['window_start'] + self.window) > now:
+                    break
+                self._entries.popitem(last=False)
+
+
+otp_metadata = MetaData()
+
+otp_codes = Table(
+    'otp_codes', otp_metadata,
+    Column('email', String(255), primary_key=True),
+    Column('otp', String(16), nullable=True),
+    Column('expires_at', Double, nullable=False),
+    Column('window_start', Double, nullable=False),
+    Column('sends', Integer, nullable=False, default=1),
+    Column('purge_at', Double, nullable=False, index=True),
+)
+
+
+class DatabaseOTPStore(OTPStore):
+    """Store shared by every worker process through an `otp_codes` table.
+
+    Lookups go through the email primary key and verification is a single
+    conditional UPDATE, so two workers can never both accept the same code.
+    get_engine is called on each operation so the store can be created
+    before the application's engine exists. The table is created by
+    migration 10 (`flask db-upgrade`).
+    """
+
+    def __init__(self, get_engine, **kwargs):
+        super().__init__(**kwargs)
+        self.get_engine = get_engine
+
+    def _purge_at(self, expires_at, window_start):
+        return max(expires_at, window_start + self.window)
+
+    def issue(self, email, otp, _retry=True):
+        self.maybe_sweep()
+        now = self.clock()
+        expires_at = now + self.ttl
+        try:
+            with self.get_engine().begin() as conn:
+                row = conn.execute(
+                    select(otp_codes.c.window_start, otp_codes.c.sends)
+                    .where(otp_codes.c.email == email)
+                    .with_for_update()
+                ).first()
+
+                if row is None:
+                    conn.execute(insert(otp_codes).values(
+                        email=email, otp=otp, expires_at=expires_at, window_start=now,
+                        sends=1, purge_at=self._purge_at(expires_at, now)))
+                    return True
+
+                window_start, sends = row
+                if now - window_start < self.window:
+                    if sends >= self.max_sends:
+                        return False
+                    sends += 1
+                else:
+                    window_start, sends = now, 1
+
+                conn.execute(update(otp_codes).where(otp_codes.c.email == email).values(
+                    otp=otp, expires_at=expires_at, window_start=window_start,
+                    sends=sends, purge_at=self._purge_at(expires_at, window_start)))
+                return True
+        except IntegrityError:
+            # Another worker inserted the same email first
+            if _retry:
+                return self.issue(email, otp, _retry=False)
+            raise
+
+    def verify(self, email, otp):
+        with self.get_engine().begin() as conn:
+            result = conn.execute(
+                update(otp_codes)
+                .where(otp_codes.c.email == email,
+                       otp_codes.c.otp == otp,
+                       otp_codes.c.expires_at > self.clock())
+                .values(otp=None)
+            )
+            return result.rowcount == 1
+
+    def sweep(self):
+        with self.get_engine().begin() as conn:
+            conn.execute(delete(otp_codes).where(otp_codes.c.purge_at <= self.clock()))
+
+            excess = conn.execute(select(func.count()).select_from(otp_codes)).scalar() - self.max_size
+            if excess > 0:
+                cutoff = conn.execute(
+                    select(otp_codes.c.purge_at).order_by(otp_codes.c.purge_at.asc())
+                    .offset(excess - 1).limit(1)
+                ).scalar()
+                conn.execute(delete(otp_codes).where(otp_codes.c.purge_at <= cutoff))
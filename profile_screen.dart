@@ -1,5 +1,6 @@
 import 'package:flutter/material.dart';
 import 'package:get/get.dart';
+import 'package:greenai/session.dart';
 import 'package:greenai/url.dart';
 import 'package:http/http.dart' as http;
 import 'dart:convert';
@@ -34,6 +35,7 @@ class _ProfileScreenState extends State<ProfileScreen> {
         url,
         headers: {
           'Content-Type': 'application/json',
+          ...await Session.authHeaders(),
         },
       );
 
@@ -104,10 +106,12 @@ class _ProfileScreenState extends State<ProfileScreen> {
         url,
         headers: {
           'Content-Type': 'application/json',
+          ...await Session.authHeaders(),
         },
         body: jsonEncode(payload),
       );
 
+      Session.noteWrite(response);
       print('Update response status: ${response.statusCode}');
       print('Update response body: ${response.body}');
 
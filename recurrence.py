@@ -0,0 +1,154 @@
+from datetime import datetime, timedelta
+from threading import Lock
+import heapq
+
+
+# Same fixed steps the app uses when scheduling local notifications
+# (notification_service.dart), so server and phone agree on fire times.
+INTERVAL_DAYS = {
+    'once': None,
+    'daily': 1,
+    'weekly': 7,
+    'bi-weekly': 14,
+    'fortnightly': 14,
+    'monthly': 30,
+    'quarterly': 90,
+}
+
+
+def interval_step(interval_type):
+    days = INTERVAL_DAYS.get((interval_type or 'once').strip().lower())
+    return timedelta(days=days) if days else None
+
+
+def occurrences(start, interval_type, after=None):
+    """Lazily yield fire times of a reminder, starting at or after `after`.
+
+    The first occurrence is found arithmetically, so skipping ahead over a
+    long history costs nothing.
+    """
+    step = interval_step(interval_type)
+    if step is None:
+        if after is None or start >= after:
+            yield start
+        return
+
+    current = start
+    if after is not None and after > start:
+        skipped = -(-(after - start) // step)  # ceiling division
+        current = start + skipped * step
+    while True:
+        yield current
+        current += step
+
+
+class ReminderSchedule:
+    """Heap of next fire times for every active reminder.
+
+    Each entry's next fire time is kept at or after the schedule's cursor.
+    Queries walk the heap in time order without popping, so answering a
+    window costs O(k log k) for k matching reminders. The cursor only moves
+    forward, to the start of later queries but never past clock(): a
+    client asking about next year must not push everyone else's "now"
+    windows behind the cursor. Windows that start before it fall back to
+    a pass over the in-memory entries.
+
+    Updates push a new heap entry and bump the reminder's version; stale
+    entries are discarded when they reach the top.
+    """
+
+    def __init__(self, clock=datetime.now):
+        self.clock = clock
+        self._lock = Lock()
+        self._heap = []
+        self._entries = {}
+        self._version = 0
+        self._cursor = None
+        self.loaded = False
+
+    def __len__(self):
+        return len(self._entries)
+
+    def upsert(self, reminder_id, start, interval_type, **info):
+        """Track or replace a reminder. info is returned with each occurrence."""
+        with self._lock:
+            self._version += 1
+            entry = {'start': start, 'interval_type': interval_type,
+                     'version': self._version, **info}
+            self._entries[reminder_id] = entry
+            self._push(reminder_id, entry)
+            self._maybe_compact()
+
+    def remove(self, reminder_id):
+        with self._lock:
+            self._entries.pop(reminder_id, None)
+            self._maybe_compact()
+
+    def due(self, start, end, user_id=None, limit=None):
+        """Return occurrences in [start, end) ordered by fire time."""
+        with self._lock:
+            if self._cursor is None or start >= self._cursor:
+                # Past the cursor the heap still holds every candidate; it
+                # just may include entries that fire between cursor and start
+                cursor = min(start, self.clock())
+                if self._cursor is None or cursor > self._cursor:
+                    self._advance(cursor)
+                candidates = self._walk(end)
+            else:
+                candidates = self._entries.items()
+
+            results = []
+            for reminder_id, entry in candidates:
+                if user_id is not None and entry.get('user_id') != user_id:
+                    continue
+                for fire_at in occurrences(entry['start'], entry['interval_type'], after=start):
+                    if fire_at >= end:
+                        break
+                    results.append((fire_at, reminder_id, entry))
+
+        results.sort(key=lambda item: (item[0], item[1]))
+        if limit is not None:
+            results = results[:limit]
+        return results
+
+    def _push(self, reminder_id, entry):
+        after = self._cursor
+        fire_at = next(occurrences(entry['start'], entry['interval_type'], after=after), None)
+        if fire_at is not None:
+            heapq.heappush(self._heap, (fire_at, reminder_id, entry['version']))
+
+    def _maybe_compact(self):
+        # Stale entries only leave the heap when they fire; rebuild if they pile up
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [item for item in self._heap if self._is_current(item[1], item[2])]
+            heapq.heapify(self._heap)
+
+    def _is_current(self, reminder_id, version):
+        entry = self._entries.get(reminder_id)
+        return entry is not None and entry['version'] == version
+
+    def _advance(self, cursor):
+        """Move every heap entry's next fire time to at or after cursor."""
+        self._cursor = cursor
+        while self._heap and self._heap[0][0] < cursor:
+            _, reminder_id, version = heapq.heappop(self._heap)
+            if self._is_current(reminder_id, version):
+                self._push(reminder_id, self._entries[reminder_id])
+
+    def _walk(self, end):
+        """Return current entries whose next fire time is before end, in order."""
+        frontier = [(self._heap[0][0], 0)] if self._heap else []
+        seen = set()
+        found = []
+        while frontier:
+            fire_at, index = heapq.heappop(frontier)
+            if fire_at >= end:
+                break
+            _, reminder_id, version = self._heap[index]
+            if self._is_current(reminder_id, version) and reminder_id not in seen:
+                seen.add(reminder_id)
+                found.append((reminder_id, self._entries[reminder_id]))
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(self._heap):
+                    heapq.heappush(frontier, (self._heap[child][0], child))
+        return found
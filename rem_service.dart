@@ -1,5 +1,6 @@
 // rem_service.dart - Updated version
 import 'dart:convert';
+import 'package:greenai/retry_post.dart';
 import 'package:greenai/url.dart';
 import 'package:greenai/rem_model.dart';
 import 'package:greenai/notification_service.dart';
@@ -18,7 +19,7 @@ class ReminderService {
     int userId = 1,
   }) async {
     try {
-      final response = await http.post(
+      final response = await postWithRetry(
         Uri.parse('$baseUrl/reminders'),
         headers: {'Content-Type': 'application/json'},
         body: json.encode({
@@ -63,6 +64,25 @@ class ReminderService {
     }
   }
 
+  // Only reminders changed since the last sync, deletions included
+  // (is_active == false). Pass the returned high_water_mark as
+  // updatedSince and after_id as afterId next time; omit both for the
+  // first full sync. While has_more is true, call again straight away.
+  Future<Map<String, dynamic>> getReminderChanges({int userId = 1, String? updatedSince, int? afterId}) async {
+    try {
+      final since = Uri.encodeQueryComponent(updatedSince ?? '1970-01-01T00:00:00');
+      final after = afterId == null ? '' : '&after_id=$afterId';
+      final response = await http.get(
+        Uri.parse('$baseUrl/reminders?user_id=$userId&updated_since=$since$after'),
+        headers: {'Content-Type': 'application/json'},
+      );
+
+      return json.decode(response.body);
+    } catch (e) {
+      return {'success': false, 'message': 'Network error: $e'};
+    }
+  }
+
   Future<Map<String, dynamic>> deleteReminder(int reminderId) async {
     try {
       final response = await http.delete(
@@ -31,6 +31,12 @@ class _ReminderScreenState extends State<ReminderScreen> {
 
   List<ReminderModel> activeReminders = [];
   bool isLoadingReminders = false;
+
+  // Delta sync: active reminders as the server sent them, keyed by id,
+  // and the cursor to ask for the next changes from
+  final Map<int, Map<String, dynamic>> _reminderRecords = {};
+  String? _highWaterMark;
+  int? _afterId;
   bool isSubmitting = false;
 
   final List<String> reminderTypes = [
@@ -59,12 +65,33 @@ class _ReminderScreenState extends State<ReminderScreen> {
     });
 
     try {
-      final response = await _reminderService.getReminders();
+      // Only changes since the last load; a deleted reminder comes back
+      // with is_active == false
+      Map<String, dynamic> response;
+      do {
+        response = await _reminderService.getReminderChanges(
+          updatedSince: _highWaterMark,
+          afterId: _afterId,
+        );
+        if (response['success'] != true || response['reminders'] == null) break;
+        for (final json in response['reminders'] as List) {
+          if (json['is_active'] == true) {
+            _reminderRecords[json['id']] = json;
+          } else {
+            _reminderRecords.remove(json['id']);
+          }
+        }
+        _highWaterMark = response['high_water_mark'];
+        _afterId = response['after_id'];
+      } while (response['has_more'] == true);
+
       if (response['success'] == true && response['reminders'] != null) {
+        // Same order as the server's list: date, then time
+        final records = _reminderRecords.values.toList()
+          ..sort((a, b) => '${a['date']} ${a['time']}'.compareTo('${b['date']} ${b['time']}'));
         setState(() {
-          activeReminders = (response['reminders'] as List)
+          activeReminders = records
               .map((json) => ReminderModel.fromJson(json))
-              .where((reminder) => reminder.isActive)
               .toList();
         });
       } else {
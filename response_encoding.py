@@ -0,0 +1,48 @@
+"""Content negotiation helpers: gzip/brotli bodies and MessagePack payloads.
+
+brotli and msgpack are optional (`pip install brotli msgpack`). Without
+them only gzip and JSON are offered, so clients fall back transparently.
+"""
+from datetime import date, datetime, time
+import gzip
+import hashlib
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - depends on the environment
+    msgpack = None
+
+
+MSGPACK_MIMETYPE = 'application/msgpack'
+COMPRESSIBLE_MIMETYPES = frozenset(('application/json', MSGPACK_MIMETYPE, 'text/plain', 'text/csv'))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # 5-6 is the usual on-the-fly tradeoff; 11 is for static assets
+
+CODINGS = (('br', 'gzip') if brotli is not None else ('gzip',))
+
+
+def compress(body, coding):
+    if coding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def body_digest(body):
+    """Cache key for a response body; much cheaper than compressing it."""
+    return hashlib.blake2b(body, digest_size=16).digest()
+
+
+def _default(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not MessagePack serializable")
+
+
+def packb(payload):
+    """MessagePack bytes with datetimes as isoformat() strings, like fast_json."""
+    return msgpack.packb(payload, default=_default, use_bin_type=True)
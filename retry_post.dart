@@ -0,0 +1,39 @@
+import 'dart:async';
+import 'dart:io';
+import 'dart:math';
+import 'package:http/http.dart' as http;
+
+// POST that can be retried safely: every attempt carries the same
+// Idempotency-Key, so the server applies it once and replays the result.
+String newIdempotencyKey() {
+  final random = Random.secure();
+  return List.generate(16, (_) => random.nextInt(256).toRadixString(16).padLeft(2, '0')).join();
+}
+
+Future<http.Response> postWithRetry(
+  Uri url, {
+  Map<String, String>? headers,
+  Object? body,
+  int attempts = 3,
+  Duration timeout = const Duration(seconds: 15),
+}) async {
+  final requestHeaders = {...?headers, 'Idempotency-Key': newIdempotencyKey()};
+  for (var attempt = 1;; attempt++) {
+    try {
+      final response = await http.post(url, headers: requestHeaders, body: body).timeout(timeout);
+      // 409 with Retry-After: the first attempt is still running on the
+      // server. Any other 409 is a real conflict and goes to the caller.
+      final inProgress = response.statusCode == 409 && response.headers.containsKey('retry-after');
+      if ((response.statusCode >= 500 || inProgress) && attempt < attempts) {
+        await Future.delayed(Duration(seconds: attempt));
+        continue;
+      }
+      return response;
+    } on TimeoutException {
+      if (attempt >= attempts) rethrow;
+    } on SocketException {
+      if (attempt >= attempts) rethrow;
+    }
+    await Future.delayed(Duration(seconds: attempt));
+  }
+}
@@ -0,0 +1,188 @@
+"""In-process inverted index over community chat messages.
+
+Postings are append-only arrays of message ids (ids only grow, so every
+list stays sorted) with a parallel array of term frequencies. Queries
+match all terms, intersecting from the rarest posting list with binary
+search, and rank by BM25. Common-term queries look at no more than
+max_scanned postings of the rarest term and score at most max_candidates
+of the newest matches, which keeps latency flat as the corpus grows.
+
+The index is rebuilt from a pickled snapshot plus the rows added since,
+so startup doesn't have to re-tokenize the whole table.
+"""
+from array import array
+from bisect import bisect_left
+from threading import RLock
+import heapq
+import math
+import os
+import pickle
+import re
+
+
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+STOPWORDS = frozenset(
+    'a an and are as at be by for from has have i in is it its my of on or our so that the '
+    'this to was we what when where which who will with you your'.split()
+)
+SNAPSHOT_VERSION = 1
+
+
+def tokenize(text):
+    return [token for token in TOKEN_PATTERN.findall(text.lower())
+            if len(token) > 1 and token not in STOPWORDS]
+
+
+class InvertedIndex:
+    def __init__(self, k1=1.2, b=0.75, max_candidates=5000, max_scanned=20000):
+        self.k1 = k1
+        self.b = b
+        self.max_candidates = max_candidates
+        self.max_scanned = max_scanned
+        self.last_id = 0
+        self.documents = 0
+        self.total_length = 0
+        self._postings = {}
+        self._frequencies = {}
+        self._lengths = array('H')
+        self._lock = RLock()
+
+    def __len__(self):
+        return self.documents
+
+    def add(self, message_id, text):
+        """Index one message. Returns False if it was already indexed.
+
+        Ids normally arrive in increasing order and are appended; an id
+        older than last_id (concurrent commits) is inserted in place.
+        """
+        with self._lock:
+            counts = {}
+            for token in tokenize(text):
+                counts[token] = counts.get(token, 0) + 1
+            in_order = message_id > self.last_id
+            if not in_order and self._contains(message_id, counts):
+                return False
+
+            for token, count in counts.items():
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = array('I')
+                    self._frequencies[token] = array('H')
+                if in_order:
+                    postings.append(message_id)
+                    self._frequencies[token].append(min(count, 0xFFFF))
+                else:
+                    pos = bisect_left(postings, message_id)
+                    postings.insert(pos, message_id)
+                    self._frequencies[token].insert(pos, min(count, 0xFFFF))
+
+            length = min(sum(counts.values()), 0xFFFF)
+            if len(self._lengths) <= message_id:
+                self._lengths.extend([0] * (message_id + 1 - len(self._lengths)))
+            self._lengths[message_id] = length
+            self.documents += 1
+            self.total_length += length
+            self.last_id = max(self.last_id, message_id)
+            return True
+
+    def _contains(self, message_id, counts):
+        if not counts:
+            return message_id < len(self._lengths) and self._lengths[message_id] > 0
+        postings = self._postings.get(next(iter(counts)))
+        if postings is None:
+            return False
+        pos = bisect_left(postings, message_id)
+        return pos < len(postings) and postings[pos] == message_id
+
+    def search(self, query, limit=20, offset=0):
+        """Return (total_matches, exact, [(message_id, score), ...]) ranked by BM25.
+
+        When the walk stops early (max_candidates matches found or
+        max_scanned postings read), only the newest matches are ranked and
+        total_matches is extrapolated (exact is False).
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        with self._lock:
+            if not terms or not self.documents:
+                return 0, True, []
+            lists = []
+            for term in terms:
+                postings = self._postings.get(term)
+                if postings is None:
+                    return 0, True, []
+                lists.append((len(postings), term, postings, self._frequencies[term]))
+            lists.sort()
+
+            # Walk the rarest list newest-first, probing the others
+            _, _, rarest, rarest_tf = lists[0]
+            others = lists[1:]
+            candidates = []
+            scanned = 0
+            for i in range(len(rarest) - 1, -1, -1):
+                if len(candidates) >= self.max_candidates or scanned >= self.max_scanned:
+                    break
+                scanned += 1
+                message_id = rarest[i]
+                tfs = [rarest_tf[i]]
+                for _, _, postings, frequencies in others:
+                    pos = bisect_left(postings, message_id)
+                    if pos == len(postings) or postings[pos] != message_id:
+                        break
+                    tfs.append(frequencies[pos])
+                else:
+                    candidates.append((message_id, tfs))
+
+            exact = scanned == len(rarest)
+            total = len(candidates) if exact else round(len(candidates) * len(rarest) / scanned)
+
+            n = self.documents
+            average_length = self.total_length / n
+            idfs = [math.log(1 + (n - df + 0.5) / (df + 0.5)) for df, _, _, _ in lists]
+            k1, b = self.k1, self.b
+            lengths = self._lengths
+
+            scored = []
+            for message_id, tfs in candidates:
+                norm = k1 * (1 - b + b * lengths[message_id] / average_length)
+                scored.append((sum(idf * tf * (k1 + 1) / (tf + norm) for idf, tf in zip(idfs, tfs)),
+                               message_id))
+
+            ranked = heapq.nlargest(offset + limit, scored)
+            return total, exact, [(message_id, round(score, 4))
+                                  for score, message_id in ranked[offset:offset + limit]]
+
+    def save(self, path):
+        """Write a snapshot atomically."""
+        with self._lock:
+            state = {
+                'version': SNAPSHOT_VERSION,
+                'last_id': self.last_id,
+                'documents': self.documents,
+                'total_length': self.total_length,
+                'postings': self._postings,
+                'frequencies': self._frequencies,
+                'lengths': self._lengths,
+            }
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def load(self, path):
+        """Replace the index with a snapshot. Returns False if unusable."""
+        try:
+            with open(path, 'rb') as f:
+                state = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return False
+        if state.get('version') != SNAPSHOT_VERSION:
+            return False
+        with self._lock:
+            self.last_id = state['last_id']
+            self.documents = state['documents']
+            self.total_length = state['total_length']
+            self._postings = state['postings']
+            self._frequencies = state['frequencies']
+            self._lengths = state['lengths']
+        return True
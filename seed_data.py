@@ -0,0 +1,98 @@
+"""Deterministic fake data for local databases, benchmarks and load tests.
+
+    flask --app greenai_app db-init
+    flask --app greenai_app db-seed --users 10000 --messages 100000 --reminders 50000
+"""
+from datetime import date, datetime, time, timedelta
+import random
+
+from greenai_app import db, UserDetails, Active, ChatMessage, Reminder, rebuild_crop_stats, rebuild_user_locations
+
+
+CROPS = ['paddy', 'tomato', 'sugarcane', 'cotton', 'groundnut', 'banana', 'maize', 'chilli']
+LANGUAGES = ['en', 'ta', 'te', 'hi', 'kn']
+REMINDER_TYPES = ['Irrigation', 'Fertilizer', 'Pesticide', 'Harvest', 'Weeding']
+INTERVALS = ['Once', 'Daily', 'Weekly', 'Bi-weekly', 'Monthly', 'Quarterly']
+WORDS = ('leaf blight paddy yellow spots tomato wilt rain forecast market price urea '
+         'spray neem drip irrigation harvest seeds stem borer aphids monsoon soil').split()
+
+BATCH_SIZE = 5000
+
+
+def user_email(i):
+    return f'farmer{i}@greenai.test'
+
+
+def _insert(model, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            db.session.bulk_insert_mappings(model, batch)
+            db.session.commit()
+            batch = []
+    if batch:
+        db.session.bulk_insert_mappings(model, batch)
+        db.session.commit()
+
+
+def seed_users(count, rng, start=0):
+    """Insert userdetails rows farmer{start}..; every user is also active."""
+    def rows():
+        for i in range(start, start + count):
+            yield {
+                'name': f'Farmer {i}',
+                'email': user_email(i),
+                'mobile': f'9{i:09d}',
+                'language': rng.choice(LANGUAGES),
+                'location': f'{rng.uniform(8.0, 20.0):.5f},{rng.uniform(74.0, 84.0):.5f}',
+                'crops': ', '.join(rng.sample(CROPS, rng.randint(1, 3))),
+                'land_size': f'{rng.uniform(0.5, 10):.1f}'
+            }
+    _insert(UserDetails, rows())
+    _insert(Active, ({'email': user_email(i)} for i in range(start, start + count)))
+    # Bulk inserts bypass add_userdetails, so recompute the derived tables
+    rebuild_crop_stats()
+    rebuild_user_locations()
+
+
+def seed_messages(count, rng, users, start_time=None):
+    start_time = start_time or datetime.utcnow() - timedelta(seconds=count * 30)
+
+    def rows():
+        for i in range(count):
+            yield {
+                'name': f'Farmer {rng.randrange(max(users, 1))}',
+                'message': ' '.join(rng.choice(WORDS) for _ in range(rng.randint(3, 25))),
+                'timestamp': start_time + timedelta(seconds=i * 30)
+            }
+    _insert(ChatMessage, rows())
+
+
+def seed_reminders(count, rng, users):
+    today = date.today()
+    now = datetime.utcnow()
+
+    def rows():
+        for _ in range(count):
+            yield {
+                'user_id': rng.randrange(1, max(users, 1) + 1),
+                'reminder_type': rng.choice(REMINDER_TYPES),
+                'crop_type': rng.choice(CROPS),
+                'date': today + timedelta(days=rng.randint(-60, 120)),
+                'time': time(rng.randrange(5, 20), rng.choice((0, 15, 30, 45))),
+                'interval_type': rng.choice(INTERVALS),
+                'is_active': rng.random() > 0.1,
+                'created_at': now,
+                'updated_at': now
+            }
+    _insert(Reminder, rows())
+
+
+def seed_all(users=1000, messages=10000, reminders=5000, seed=42):
+    """Seed every table with reproducible data. Returns the row counts."""
+    rng = random.Random(seed)
+    seed_users(users, rng)
+    seed_messages(messages, rng, users)
+    seed_reminders(reminders, rng, users)
+    return {'users': users, 'messages': messages, 'reminders': reminders}
@@ -0,0 +1,75 @@
+"""Sentiment scoring for community chat, run off the request path.
+
+TextBlob (and NLTK behind it) is imported on first use by the worker, so
+processes that never score anything don't pay for the import.
+"""
+from threading import Event, Lock, Thread
+
+_textblob = None
+_import_lock = Lock()
+
+POSITIVE_THRESHOLD = 0.1
+NEGATIVE_THRESHOLD = -0.1
+
+
+def load_textblob():
+    global _textblob
+    if _textblob is None:
+        with _import_lock:
+            if _textblob is None:
+                from textblob import TextBlob
+                _textblob = TextBlob
+    return _textblob
+
+
+def polarity(text):
+    """TextBlob polarity of text, from -1.0 (negative) to 1.0 (positive)."""
+    return load_textblob()(text).sentiment.polarity
+
+
+def label(score):
+    if score > POSITIVE_THRESHOLD:
+        return 'positive'
+    if score < NEGATIVE_THRESHOLD:
+        return 'negative'
+    return 'neutral'
+
+
+class SentimentWorker:
+    """Background thread that repeatedly calls run_batch() until it runs dry.
+
+    run_batch() scores a batch of unscored messages and returns how many it
+    handled. The thread sleeps for interval seconds between empty passes;
+    wake() cuts the sleep short after a new message is posted.
+    """
+
+    def __init__(self, run_batch, interval=5.0):
+        self.run_batch = run_batch
+        self.interval = interval
+        self.scored = 0
+        self.errors = 0
+        self._wake = Event()
+        self._thread = None
+        self._start_lock = Lock()
+
+    def wake(self):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = Thread(target=self._run, name='sentiment-worker', daemon=True)
+                    self._thread.start()
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                while True:
+                    handled = self.run_batch()
+                    self.scored += handled
+                    if not handled:
+                        break
+            except Exception as e:
+                self.errors += 1
+                print(f"Error in sentiment worker: {e}")
@@ -0,0 +1,52 @@
+import 'package:greenai/url.dart';
+import 'package:http/http.dart' as http;
+import 'package:shared_preferences/shared_preferences.dart';
+
+// Session token issued by /verify_otp, sent as `Authorization: Bearer <token>`
+class Session {
+  static const String _tokenKey = 'session_token';
+  static String? _token;
+  // X-Wrote-At from our last write, echoed back so whichever server
+  // worker answers next reads our own changes from the primary database
+  static String? _wroteAt;
+
+  static Future<void> save(String? token) async {
+    if (token == null) return;
+    _token = token;
+    final prefs = await SharedPreferences.getInstance();
+    await prefs.setString(_tokenKey, token);
+  }
+
+  static Future<String?> token() async {
+    if (_token != null) return _token;
+    final prefs = await SharedPreferences.getInstance();
+    _token = prefs.getString(_tokenKey);
+    return _token;
+  }
+
+  static Future<Map<String, String>> authHeaders() async {
+    final token = await Session.token();
+    return {
+      if (token != null) 'Authorization': 'Bearer $token',
+      if (_wroteAt != null) 'X-Wrote-At': _wroteAt!,
+    };
+  }
+
+  static void noteWrite(http.Response response) {
+    final wroteAt = response.headers['x-wrote-at'];
+    if (wroteAt != null) _wroteAt = wroteAt;
+  }
+
+  static Future<void> logout() async {
+    final headers = await authHeaders();
+    _token = null;
+    final prefs = await SharedPreferences.getInstance();
+    await prefs.remove(_tokenKey);
+    if (!headers.containsKey('Authorization')) return;
+    try {
+      await http.post(Uri.parse('${Url.Urls}/logout'), headers: headers);
+    } catch (e) {
+      print('Error logging out: $e');
+    }
+  }
+}
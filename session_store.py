@@ -0,0 +1,196 @@
+from collections import OrderedDict
+from threading import Lock
+import hashlib
+import secrets
+import time
+
+from sqlalchemy import Column, Double, MetaData, String, Table
+from sqlalchemy import delete, insert, select, update
+
+
+def new_token():
+    return secrets.token_urlsafe(32)
+
+
+class SessionStore:
+    """Maps opaque session tokens to the email they were issued for.
+
+    issue() is called once an OTP has been verified; resolve() is the only
+    call on the request path and must not touch the `active` table.
+    Sessions last ttl seconds from issue.
+    """
+
+    def __init__(self, ttl=30 * 24 * 3600, max_size=100000, sweep_interval=60, clock=time.time):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.sweep_interval = sweep_interval
+        self.clock = clock
+        self._last_sweep = clock()
+
+    def issue(self, email):
+        """Start a session for email and return its token."""
+        raise NotImplementedError
+
+    def resolve(self, token):
+        """Email for a live token, else None."""
+        raise NotImplementedError
+
+    def revoke(self, token):
+        raise NotImplementedError
+
+    def rename(self, old_email, new_email):
+        """Move every session of old_email to new_email (profile email change)."""
+        raise NotImplementedError
+
+    def sweep(self):
+        """Drop expired sessions and enforce max_size."""
+        raise NotImplementedError
+
+    def maybe_sweep(self):
+        now = self.clock()
+        if now - self._last_sweep >= self.sweep_interval:
+            self._last_sweep = now
+            self.sweep()
+
+
+class MemorySessionStore(SessionStore):
+    """Per-process store. Only correct with a single worker process.
+
+    Sessions are kept in issue order, which is also expiry order, so
+    sweeping pops from the front and max_size evicts the oldest session.
+    Each entry is a (email, expires_at) tuple; a second dict from email to
+    its tokens makes rename() independent of the table size.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._sessions = OrderedDict()
+        self._by_email = {}
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def issue(self, email):
+        token = new_token()
+        self.put(token, email, self.clock() + self.ttl)
+        return token
+
+    def put(self, token, email, expires_at):
+        self.maybe_sweep()
+        with self._lock:
+            self._discard(token)
+            self._sessions[token] = (email, expires_at)
+            self._by_email.setdefault(email, set()).add(token)
+            while len(self._sessions) > self.max_size:
+                self._discard(next(iter(self._sessions)))
+
+    def resolve(self, token):
+        entry = self._sessions.get(token)
+        if entry is None or entry[1] <= self.clock():
+            return None
+        return entry[0]
+
+    def revoke(self, token):
+        with self._lock:
+            self._discard(token)
+
+    def rename(self, old_email, new_email):
+        with self._lock:
+            tokens = self._by_email.pop(old_email, set())
+            for token in tokens:
+                self._sessions[token] = (new_email, self._sessions[token][1])
+            if tokens:
+                self._by_email.setdefault(new_email, set()).update(tokens)
+
+    def sweep(self):
+        now = self.clock()
+        with self._lock:
+            while self._sessions:
+                token, (_, expires_at) = next(iter(self._sessions.items()))
+                if expires_at > now:
+                    break
+                self._discard(token)
+
+    def _discard(self, token):
+        entry = self._sessions.pop(token, None)
+        if entry is None:
+            return
+        tokens = self._by_email.get(entry[0])
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._by_email[entry[0]]
+
+
+session_metadata = MetaData()
+
+sessions = Table(
+    'sessions', session_metadata,
+    Column('token_hash', String(64), primary_key=True),
+    Column('email', String(255), nullable=False, index=True),
+    Column('expires_at', Double, nullable=False, index=True),
+)
+
+
+def token_hash(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class DatabaseSessionStore(SessionStore):
+    """Store shared by every worker process through a `sessions` table.
+
+    Only a SHA-256 of each token is written. Resolved sessions are kept in a
+    per-process MemorySessionStore for up to cache_ttl seconds, so a live
+    session costs one primary-key lookup per process per cache_ttl; a
+    revoke or rename in another process is seen within that window.
+    The table is created by migration 10 (`flask db-upgrade`).
+    """
+
+    def __init__(self, get_engine, cache_ttl=60, cache_size=10000, **kwargs):
+        super().__init__(**kwargs)
+        self.get_engine = get_engine
+        self.cache_ttl = cache_ttl
+        self._cache = MemorySessionStore(max_size=cache_size, clock=self.clock)
+
+    def _cache_put(self, token, email, expires_at):
+        self._cache.put(token, email, min(expires_at, self.clock() + self.cache_ttl))
+
+    def issue(self, email):
+        self.maybe_sweep()
+        token = new_token()
+        expires_at = self.clock() + self.ttl
+        with self.get_engine().begin() as conn:
+            conn.execute(insert(sessions).values(
+                token_hash=token_hash(token), email=email, expires_at=expires_at))
+        self._cache_put(token, email, expires_at)
+        return token
+
+    def resolve(self, token):
+        email = self._cache.resolve(token)
+        if email is not None:
+            return email
+        with self.get_engine().connect() as conn:
+            row = conn.execute(
+                select(sessions.c.email, sessions.c.expires_at)
+                .where(sessions.c.token_hash == token_hash(token),
+                       sessions.c.expires_at > self.clock())
+            ).first()
+        if row is None:
+            return None
+        self._cache_put(token, row.email, row.expires_at)
+        return row.email
+
+    def revoke(self, token):
+        self._cache.revoke(token)
+        with self.get_engine().begin() as conn:
+            conn.execute(delete(sessions).where(sessions.c.token_hash == token_hash(token)))
+
+    def rename(self, old_email, new_email):
+        self._cache.rename(old_email, new_email)
+        with self.get_engine().begin() as conn:
+            conn.execute(update(sessions).where(sessions.c.email == old_email).values(email=new_email))
+
+    def sweep(self):
+        with self.get_engine().begin() as conn:
+            conn.execute(delete(sessions).where(sessions.c.expires_at <= self.clock()))
@@ -1,5 +1,7 @@
 import 'package:flutter/material.dart';
 import 'package:get/get.dart';
+import 'package:greenai/retry_post.dart';
+import 'package:greenai/session.dart';
 import 'package:greenai/url.dart';
 import 'package:http/http.dart' as http;
 import 'dart:convert';
@@ -84,7 +86,7 @@ class _SignupScreenState extends State<SignupScreen> {
       headers: {'Content-Type': 'application/json'},
       body: jsonEncode({'email': email}),
     );
-    if (response.statusCode == 200) {
+    if (response.statusCode == 200 || response.statusCode == 202) {
       var data = jsonDecode(response.body);
       return data['status'] == 'success';
     }
@@ -100,6 +102,7 @@ class _SignupScreenState extends State<SignupScreen> {
     );
     if (response.statusCode == 200) {
       var data = jsonDecode(response.body);
+      await Session.save(data['token']);
       return data['status'] == 'success';
     }
     return false;
@@ -127,7 +130,7 @@ class _SignupScreenState extends State<SignupScreen> {
 
     final url = Uri.parse('${Url.Urls}/userdetails');
 
-    final response = await http.post(
+    final response = await postWithRetry(
       url,
       headers: {'Content-Type': 'application/json'},
       body: jsonEncode({
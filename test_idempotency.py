@@ -0,0 +1,129 @@
+"""Tests for the Idempotency-Key stores: `python -m pytest test_idempotency.py`."""
+from concurrent.futures import ThreadPoolExecutor
+import time
+
+import pytest
+from sqlalchemy import create_engine
+
+from idempotency import (DatabaseIdempotencyStore, MemoryIdempotencyStore, StoredResponse,
+                         idempotency_metadata)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'idempotency.db'}")
+    idempotency_metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+def memory_store(engine, **kwargs):
+    return MemoryIdempotencyStore(**kwargs)
+
+
+def database_store(engine, **kwargs):
+    store = DatabaseIdempotencyStore(lambda: engine, **kwargs)
+    store.POLL_INTERVAL = 0.01
+    return store
+
+
+STORES = [memory_store, database_store]
+
+
+@pytest.mark.parametrize('make_store', STORES)
+def test_replays_completed_response(engine, make_store):
+    store = make_store(engine, wait=1)
+    assert store.begin('k', 'body') == ('execute', None)
+    store.complete('k', StoredResponse(201, b'{"id": 1}', 'application/json'))
+
+    outcome, stored = store.begin('k', 'body')
+    assert outcome == 'replay'
+    assert (stored.status, stored.body, stored.mimetype) == (201, b'{"id": 1}', 'application/json')
+
+
+@pytest.mark.parametrize('make_store', STORES)
+def test_rejects_key_reused_with_another_body(engine, make_store):
+    store = make_store(engine, wait=1)
+    store.begin('k', 'body')
+    assert store.begin('k', 'other body') == ('mismatch', None)
+
+
+@pytest.mark.parametrize('make_store', STORES)
+def test_abort_lets_the_retry_run(engine, make_store):
+    store = make_store(engine, wait=1)
+    store.begin('k', 'body')
+    store.abort('k')
+    assert store.begin('k', 'body') == ('execute', None)
+
+
+@pytest.mark.parametrize('make_store', STORES)
+def test_duplicate_times_out_while_first_runs(engine, make_store):
+    # A frozen clock keeps the database store from treating the running
+    # claim as abandoned (which it does once the claim is `wait` old)
+    store = make_store(engine, wait=0.1, clock=lambda: 1000.0)
+    store.begin('k', 'body')
+    assert store.begin('k', 'body') == ('in_progress', None)
+
+
+@pytest.mark.parametrize('make_store', STORES)
+def test_expired_key_runs_again(engine, make_store):
+    now = [1000.0]
+    store = make_store(engine, ttl=10, wait=1, clock=lambda: now[0])
+    store.begin('k', 'body')
+    store.complete('k', StoredResponse(200, b'first', 'text/plain'))
+    now[0] += 11
+    assert store.begin('k', 'body') == ('execute', None)
+
+
+@pytest.mark.parametrize('make_store', STORES)
+def test_waiters_replay_the_first_execution(engine, make_store):
+    store = make_store(engine, wait=5)
+    assert store.begin('k', 'body') == ('execute', None)
+    waiters = [store] * 3 if make_store is memory_store else [make_store(engine, wait=5) for _ in range(3)]
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(waiter.begin, 'k', 'body') for waiter in waiters]
+        time.sleep(0.2)
+        assert not any(future.done() for future in futures)
+        store.complete('k', StoredResponse(201, b'done', 'text/plain'))
+        assert [future.result(timeout=10)[0] for future in futures] == ['replay'] * 3
+
+
+@pytest.mark.parametrize('make_store', STORES)
+def test_only_one_waiter_takes_over_after_abort(engine, make_store):
+    store = make_store(engine, wait=5)
+    assert store.begin('k', 'body') == ('execute', None)
+    # The memory store is per process, so its waiters share it; database
+    # waiters each get their own store, like separate worker processes
+    waiters = [store] * 3 if make_store is memory_store else [make_store(engine, wait=5) for _ in range(3)]
+
+    def duplicate(waiter):
+        outcome, stored = waiter.begin('k', 'body')
+        if outcome == 'execute':
+            time.sleep(0.1)
+            waiter.complete('k', StoredResponse(201, b'second', 'text/plain'))
+        return outcome, stored
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(duplicate, waiter) for waiter in waiters]
+        time.sleep(0.2)
+        store.abort('k')
+        results = [future.result(timeout=10) for future in futures]
+    outcomes = sorted(outcome for outcome, _ in results)
+    assert outcomes == ['execute', 'replay', 'replay']
+    assert all(stored.body == b'second' for outcome, stored in results if outcome == 'replay')
+
+
+def test_database_store_takes_over_abandoned_claim(engine):
+    crashed = database_store(engine, wait=0.2)
+    assert crashed.begin('k', 'body') == ('execute', None)
+    # The claiming process died without completing or aborting
+    other = database_store(engine, wait=0.2)
+    assert other.begin('k', 'body') == ('execute', None)
+
+
+def test_database_store_shares_responses_between_processes(engine):
+    first, second = database_store(engine, wait=1), database_store(engine, wait=1)
+    assert first.begin('k', 'body') == ('execute', None)
+    first.complete('k', StoredResponse(200, b'ok', 'text/plain'))
+    outcome, stored = second.begin('k', 'body')
+    assert outcome == 'replay' and stored.body == b'ok'